@@ -1,5 +1,6 @@
 from .auth.routes import router as auth_router
+from .event.routes import router as event_router
 from .user.routes import router as user_router
 from .user_interest.routes import router as user_interest_router
 
-ROUTERS = [auth_router, user_router, user_interest_router]
+ROUTERS = [auth_router, user_router, user_interest_router, event_router]
@@ -1,91 +1,109 @@
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
-import bcrypt
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import ValidationError
 
 from app.config import settings
 from app.core.models.user import User
+from app.core.services.token_store import TokenStore
+from app.core.services.user_cache import UserCache
 
-from .schemas import TokenPayload
+from .schemas import TokenPayload, TokenType
 
 security = HTTPBearer()
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt.
+def create_token(subject: str, expires_delta: timedelta, kind: TokenType, family: str, token_id: str) -> str:
+    """Create a JWT token with expiration time.
 
     Args:
-        password: Plain text password to hash
+        subject: Subject of the token (typically user ID)
+        expires_delta: Time until token expiration
+        kind: Whether the token is an access or a refresh token
+        family: ID of the login the token belongs to, shared by every token refreshed from it
+        token_id: Unique ID of the token
 
     Returns:
-        Hashed password as a string
+        Encoded JWT token
     """
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-    return hashed_password.decode("utf-8")
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode = {"exp": expire, "sub": subject, "type": kind, "fam": family, "jti": token_id}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash.
+def decode_token(token: str, kind: TokenType) -> TokenPayload:
+    """Decode and validate a JWT token of a type.
 
     Args:
-        plain_password: Plain text password to verify
-        hashed_password: Hashed password to compare against
+        token: Encoded JWT token
+        kind: Expected type of the token
 
     Returns:
-        True if password matches hash, False otherwise
-    """
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
-
-
-def create_token(subject: str, expires_delta: timedelta) -> str:
-    """Create a JWT token with expiration time.
+        Token payload
 
-    Args:
-        subject: Subject of the token (typically user ID)
-        expires_delta: Time until token expiration
-
-    Returns:
-        Encoded JWT token
+    Raises:
+        jwt.PyJWTError: If the token is invalid, expired or of another type
     """
-    expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": subject}
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    try:
+        token_data = TokenPayload.model_validate(payload)
+    except ValidationError as e:
+        raise jwt.InvalidTokenError("Invalid token claims") from e
+    if token_data.type != kind:
+        raise jwt.InvalidTokenError(f"Expected a {kind} token")
+    return token_data
 
 
-async def get_current_user(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]) -> User:
-    """Dependency to get and validate the current user from a Bearer JWT token.
+async def get_access_token(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]) -> TokenPayload:
+    """Dependency to get the payload of a valid, unrevoked Bearer access token.
+
+    Revocation is checked against the local denylist snapshot, with no network round trip.
 
     Args:
         credentials: Bearer token credentials from Authorization header
 
     Returns:
-        Authenticated user object
+        Access token payload
 
     Raises:
-        HTTPException (401): If token is invalid or user doesn't exist
+        HTTPException (401): If token is invalid, expired or revoked
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or expired Bearer token",
         headers={"WWW-Authenticate": "Bearer"},
     )
-
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenPayload(sub=user_id, exp=payload.get("exp"))
-    except (jwt.PyJWTError, AttributeError) as e:
+        token_data = decode_token(credentials.credentials, "access")
+    except jwt.PyJWTError as e:
         raise credentials_exception from e
+    if TokenStore.is_revoked(token_data.fam):
+        raise credentials_exception
+    return token_data
+
+
+async def get_current_user(token_data: Annotated[TokenPayload, Depends(get_access_token)]) -> User:
+    """Dependency to get and validate the current user from a Bearer JWT token.
 
-    user = await User.get(token_data.sub)
+    Args:
+        token_data: Payload of the access token
+
+    Returns:
+        Authenticated user object
+
+    Raises:
+        HTTPException (401): If token is invalid or user doesn't exist
+    """
+    user = await UserCache.get_user(token_data.sub)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired Bearer token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user")
     return user
@@ -3,7 +3,10 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from .schemas import Token, TokenRefresh, UserCreate
+from app.core.models.user import User
+
+from .dependencies import get_access_token, get_current_user
+from .schemas import Token, TokenPayload, TokenRefresh, UserCreate
 from .service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -37,6 +40,25 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
 async def refresh_token(body: TokenRefresh):
     """Refresh access token.
 
-    Returns status code 401, if refresh token is invalid.
+    The refresh token can only be used once, the response contains its replacement.
+    Returns status code 401, if refresh token is invalid, revoked or was already used.
     """
     return await AuthService.refresh_token(refresh_token=body.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token_data: Annotated[TokenPayload, Depends(get_access_token)]):
+    """Log out, revoking the refresh token and the access tokens of this login.
+
+    Returns status code 401, if token is invalid.
+    """
+    await AuthService.logout(token_data)
+
+
+@router.post("/logout-everywhere", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_everywhere(current_user: Annotated[User, Depends(get_current_user)]):
+    """Log out of every login of the current user, for example when the account is compromised.
+
+    Returns status code 401, if token is invalid.
+    """
+    await AuthService.logout_everywhere(str(current_user.id))
@@ -1,4 +1,5 @@
 import re
+from typing import Literal
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -6,6 +7,8 @@ from app.config import settings
 
 PASSWORD_REGEX = re.compile(settings.PASSWORD_PATTERN)
 
+TokenType = Literal["access", "refresh"]
+
 
 class UserCreate(BaseModel):
     """User creation schema."""
@@ -43,6 +46,9 @@ class TokenPayload(BaseModel):
 
     sub: str
     exp: int
+    type: TokenType
+    fam: str = Field(description="ID of the login the token belongs to")
+    jti: str = Field(description="Unique ID of the token")
 
 
 class TokenRefresh(BaseModel):
@@ -1,15 +1,29 @@
+import logging
+import uuid
 from datetime import timedelta
 
 import jwt
-from beanie.operators import Or
 from fastapi import HTTPException, status
 from pydantic import EmailStr
+from pymongo.errors import DuplicateKeyError
+from redis.exceptions import RedisError
 
 from app.config import settings
-from app.core.models.user import User
+from app.core.models.user import CASE_INSENSITIVE, User
+from app.core.services.password_service import PasswordService
+from app.core.services.token_store import Rotation, TokenStore
 
-from .dependencies import create_token, get_password_hash, verify_password
-from .schemas import Token
+from .dependencies import create_token, decode_token
+from .schemas import Token, TokenPayload
+
+logger = logging.getLogger(__name__)
+
+
+def _token_store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Token store is unavailable, try again later",
+    )
 
 
 class AuthService:
@@ -19,6 +33,9 @@ class AuthService:
     async def register(name: str, username: str, email: EmailStr, password: str) -> User:
         """Register a new user.
 
+        Usernames and emails are checked by their unique indexes on insert, so
+        concurrent registrations with the same ones can't both succeed.
+
         Args:
             name: User's name
             username: User's username
@@ -30,23 +47,44 @@ class AuthService:
 
         Raises:
             HTTPException (400): If user with this username or email already exists
+            HTTPException (503): If the password hashing pool is saturated
         """
-        existing_user = await User.find_one(Or(User.username == username, User.email == email))
-        if existing_user:
+        hashed_password = await PasswordService.hash_password(password)
+        user = User(name=name, username=username, email=email, password_hash=hashed_password)
+        try:
+            await user.insert()
+        except DuplicateKeyError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this username or email already exists",
-            )
-
-        hashed_password = get_password_hash(password)
-        user = User(name=name, username=username, email=email, password_hash=hashed_password)
-        await user.insert()
+            ) from e
         return user
 
+    @staticmethod
+    def _create_tokens(user_id: str, family: str, refresh_token_id: str) -> Token:
+        """Create an access token and a refresh token of a family."""
+        access_token = create_token(
+            subject=user_id,
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            kind="access",
+            family=family,
+            token_id=uuid.uuid4().hex,
+        )
+        refresh_token = create_token(
+            subject=user_id,
+            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            kind="refresh",
+            family=family,
+            token_id=refresh_token_id,
+        )
+        return Token(access_token=access_token, refresh_token=refresh_token)
+
     @staticmethod
     async def login(username: str, password: str) -> Token:
         """Authenticate a user and generate access and refresh tokens.
 
+        Each login starts a new token family, which refreshes and revocations follow.
+
         Args:
             username: User's username
             password: User's password
@@ -56,31 +94,32 @@ class AuthService:
 
         Raises:
             HTTPException (401): If credentials are invalid
+            HTTPException (503): If the password hashing pool is saturated or the token store is unavailable
         """
-        user = await User.find_one(User.username == username)
-        if not user or not verify_password(password, user.password_hash):
+        user = await User.find_one(User.username == username, collation=CASE_INSENSITIVE)
+        if not user or not await PasswordService.verify_password(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token = create_token(
-            subject=str(user.id),
-            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-        )
-
-        refresh_token = create_token(
-            subject=str(user.id),
-            expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-        )
-
-        return Token(access_token=access_token, refresh_token=refresh_token)
+        user_id = str(user.id)
+        family, refresh_token_id = uuid.uuid4().hex, uuid.uuid4().hex
+        try:
+            await TokenStore.start_family(user_id, family, refresh_token_id)
+        except RedisError as e:
+            raise _token_store_unavailable() from e
+        return AuthService._create_tokens(user_id, family, refresh_token_id)
 
     @staticmethod
     async def refresh_token(refresh_token: str) -> Token:
         """Generate new access and refresh tokens using a valid refresh token.
 
+        Refresh tokens are single use: the presented one is replaced by the new
+        one. Presenting a replaced token again means it leaked, so its whole
+        family is revoked, logging out both the thief and the user.
+
         Args:
             refresh_token: Current refresh token
 
@@ -88,40 +127,67 @@ class AuthService:
             Object containing new access and refresh tokens
 
         Raises:
-            HTTPException (401): If refresh token is invalid or user not found
+            HTTPException (401): If refresh token is invalid, revoked or reused, or user not found
+            HTTPException (503): If the token store is unavailable
         """
         try:
-            payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            user_id = payload.get("sub")
-            if user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
-            user = await User.get(user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="User not found",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
-            access_token = create_token(
-                subject=str(user.id),
-                expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
-            )
-
-            new_refresh_token = create_token(
-                subject=str(user.id),
-                expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-            )
-
-            return Token(access_token=access_token, refresh_token=new_refresh_token)
+            payload = decode_token(refresh_token, "refresh")
         except jwt.PyJWTError as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token",
                 headers={"WWW-Authenticate": "Bearer"},
             ) from e
+
+        new_refresh_token_id = uuid.uuid4().hex
+        try:
+            rotation = await TokenStore.rotate(payload.sub, payload.fam, payload.jti, new_refresh_token_id)
+        except RedisError as e:
+            raise _token_store_unavailable() from e
+        if rotation == Rotation.REUSED:
+            logger.warning("Refresh token reuse detected for user %s, token family revoked", payload.sub)
+        if rotation != Rotation.ROTATED:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        user = await User.get(payload.sub)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return AuthService._create_tokens(str(user.id), payload.fam, new_refresh_token_id)
+
+    @staticmethod
+    async def logout(token_data: TokenPayload):
+        """Revoke the refresh token and the access tokens of the login a token belongs to.
+
+        Args:
+            token_data: Payload of the current access token
+
+        Raises:
+            HTTPException (503): If the token store is unavailable
+        """
+        try:
+            await TokenStore.revoke_family(token_data.fam)
+        except RedisError as e:
+            raise _token_store_unavailable() from e
+
+    @staticmethod
+    async def logout_everywhere(user_id: str):
+        """Revoke every refresh and access token of a user, for example when the account is compromised.
+
+        Args:
+            user_id: User ID
+
+        Raises:
+            HTTPException (503): If the token store is unavailable
+        """
+        try:
+            await TokenStore.revoke_user(user_id)
+        except RedisError as e:
+            raise _token_store_unavailable() from e
@@ -0,0 +1,66 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.api.auth.dependencies import get_current_user
+from app.core.models.user import User
+
+from .schemas import EventCreate, EventFilter, EventResponse, EventSearchResponse
+from .service import EventService
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
+async def create_event(
+    event_create: EventCreate,
+    current_user: Annotated[User, Depends(get_current_user)],
+):
+    """Create an event. It is shown in search once verified.
+
+    Returns status code 401 if token is invalid or user doesn't exist.
+    """
+    return await EventService.create_event(current_user, event_create)
+
+
+@router.get("/", response_model=EventSearchResponse)
+async def find_events(
+    _: Annotated[User, Depends(get_current_user)],
+    filter_params: Annotated[EventFilter, Query(..., description="Filter parameters")],
+):
+    """Search active, verified events near a point that overlap a time window, nearest first.
+
+    Pass `next_cursor` of the response as `cursor` to get the next page.
+    Returns status code 400 if cursor is invalid.
+    """
+    events, next_cursor = await EventService.search_events(filter_params)
+    return {"events": events, "next_cursor": next_cursor}
+
+
+@router.get("/{event_id}", response_model=EventResponse)
+async def get_event(event_id: str, _: Annotated[User, Depends(get_current_user)]):
+    """Get an event by ID.
+
+    Returns status code 404 if event is not found.
+    """
+    return await EventService.get_event_by_id(event_id)
+
+
+@router.put("/{event_id}/participants/me", response_model=EventResponse)
+async def join_event(event_id: str, current_user: Annotated[User, Depends(get_current_user)]):
+    """Join an event. Joining an event again does nothing.
+
+    Returns status code 404 if event is not found.
+    Returns status code 400 if the event has ended.
+    Returns status code 409 if the event is full.
+    """
+    return await EventService.join_event(current_user, event_id)
+
+
+@router.delete("/{event_id}/participants/me", response_model=EventResponse)
+async def leave_event(event_id: str, current_user: Annotated[User, Depends(get_current_user)]):
+    """Leave an event. Leaving an event that was not joined does nothing.
+
+    Returns status code 404 if event is not found.
+    """
+    return await EventService.leave_event(current_user, event_id)
@@ -0,0 +1,102 @@
+from datetime import datetime, timezone
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.core.models.location import Location
+
+
+def as_utc(value: datetime) -> datetime:
+    """Set the UTC timezone on a date without one."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class EventCreate(BaseModel):
+    """Schema for event creation."""
+
+    title: str = Field(..., min_length=3, max_length=128)
+    description: str = Field(..., max_length=4096)
+    category: str = Field(..., min_length=1, max_length=64)
+    location: Location
+    start_date: datetime
+    end_date: datetime
+    max_participants: int = Field(..., ge=1)
+
+    @field_validator("start_date", "end_date")
+    @classmethod
+    def assume_utc(cls, v: datetime) -> datetime:
+        """Treat dates without a timezone as UTC."""
+        return as_utc(v)
+
+    @model_validator(mode="after")
+    def validate_dates(self) -> "EventCreate":
+        """Validate that the event ends after it starts and has not ended yet."""
+        if self.end_date <= self.start_date:
+            raise ValueError("end_date must be after start_date")
+        if self.end_date <= datetime.now(timezone.utc):
+            raise ValueError("end_date must be in the future")
+        return self
+
+
+class EventResponse(BaseModel):
+    """Schema for event response."""
+
+    id: PydanticObjectId
+    creator_id: PydanticObjectId | None
+    title: str
+    description: str
+    category: str
+    location: Location
+    start_date: datetime
+    end_date: datetime
+    max_participants: int
+    participants_count: int
+    verified: bool
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @field_validator("location", mode="before")
+    @classmethod
+    def convert_geojson_location(cls, v):
+        """Convert the stored GeoJSON point to latitude and longitude."""
+        return Location.from_geojson(v)
+
+
+class EventSearchResponse(BaseModel):
+    """Schema for a page of event search results."""
+
+    events: list[EventResponse]
+    next_cursor: str | None = Field(default=None, description="Cursor of the next page, null on the last page")
+
+
+class EventFilter(BaseModel):
+    """Schema for filtering events."""
+
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude to search near")
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude to search near")
+    radius_km: float = Field(default=25, gt=0, le=500, description="Maximum distance in kilometers")
+    date_from: datetime | None = Field(default=None, description="Start of the time window, now if not given")
+    date_to: datetime | None = Field(default=None, description="End of the time window")
+    category: str | None = Field(default=None, description="Filter by category")
+
+    cursor: str | None = Field(default=None, description="Cursor of the page to fetch, from `next_cursor`")
+    limit: int = Field(default=50, ge=1, le=100, description="Maximum number of records")
+
+    @field_validator("date_from", "date_to")
+    @classmethod
+    def assume_utc(cls, v: datetime | None) -> datetime | None:
+        """Treat dates without a timezone as UTC."""
+        return as_utc(v) if v is not None else None
+
+    @model_validator(mode="after")
+    def validate_window(self) -> "EventFilter":
+        """Validate that the time window is not empty."""
+        if self.date_from is not None and self.date_to is not None and self.date_to <= self.date_from:
+            raise ValueError("date_to must be after date_from")
+        return self
+
+    @property
+    def near(self) -> Location:
+        """Point to sort results by distance from."""
+        return Location(latitude=self.latitude, longitude=self.longitude)
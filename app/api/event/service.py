@@ -0,0 +1,281 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from beanie import PydanticObjectId
+from beanie.odm.queries.update import UpdateResponse
+from beanie.operators import GT, Eq
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from pydantic import Field
+from pymongo.errors import DuplicateKeyError
+
+from app.core.database import search_collection
+from app.core.models.event import Event
+from app.core.models.event_participant import EventParticipant
+from app.core.models.location import GeoPoint
+from app.core.models.user import User
+from app.core.utils.cursor import decode_cursor, encode_cursor
+
+from .schemas import EventCreate, EventFilter, EventResponse, as_utc
+
+
+class EventRead(EventResponse):
+    """Event read model with the distance from the search point."""
+
+    distance: float | None = Field(default=None, exclude=True)
+
+    class Settings:
+        """Projection of the read model."""
+
+        projection = {
+            "_id": 0,
+            "id": "$_id",
+            "creator_id": 1,
+            "title": 1,
+            "description": 1,
+            "category": 1,
+            "location": 1,
+            "start_date": 1,
+            "end_date": 1,
+            "max_participants": 1,
+            "participants_count": 1,
+            "verified": 1,
+            "is_active": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            "distance": 1,
+        }
+
+
+def _parse_event_id(event_id: str) -> PydanticObjectId:
+    """Convert an event ID from a path, a malformed ID is reported as a missing event."""
+    if not PydanticObjectId.is_valid(event_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found",
+        )
+    return PydanticObjectId(event_id)
+
+
+def _parse_cursor(cursor: str) -> tuple[float, PydanticObjectId]:
+    """Get the distance and ID of the last seen event from a page cursor."""
+    try:
+        values = decode_cursor(cursor)
+        return float(values["d"]), PydanticObjectId(values["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+
+class EventService:
+    """Service for events."""
+
+    @staticmethod
+    async def create_event(current_user: User, event_create: EventCreate) -> Event:
+        """Create an event. It is shown in search once verified.
+
+        Args:
+            current_user: User creating the event
+            event_create: Event data
+
+        Returns:
+            Created event
+        """
+        event = Event(
+            creator_id=current_user.id,
+            location=GeoPoint.from_location(event_create.location),
+            **event_create.model_dump(exclude={"location"}),
+        )
+        return await event.insert()
+
+    @staticmethod
+    async def get_event_by_id(event_id: str) -> Event:
+        """Get an active event by ID.
+
+        Args:
+            event_id: Event ID to find
+
+        Returns:
+            Event
+
+        Raises:
+            HTTPException (404): If event not found
+        """
+        event = await Event.find_one(Event.id == _parse_event_id(event_id), Eq(Event.is_active, True))
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found",
+            )
+        return event
+
+    @staticmethod
+    def build_search_pipeline(
+        filter_params: EventFilter,
+        last_distance: float | None = None,
+        last_id: PydanticObjectId | None = None,
+    ) -> list[dict]:
+        """Build the aggregation pipeline of active, verified events near a point in a time window.
+
+        Events overlapping the time window are sorted by distance, the search
+        index bounds every filter on its keys.
+
+        Args:
+            filter_params: Filter criteria
+            last_distance: Distance of the last event of the previous page
+            last_id: ID of the last event of the previous page
+
+        Returns:
+            Aggregation pipeline that returns one more event than the page size
+        """
+        date_from = filter_params.date_from or datetime.now(timezone.utc)
+        query: dict[str, Any] = {"is_active": True, "verified": True, "end_date": {"$gte": date_from}}
+        if filter_params.date_to is not None:
+            query["start_date"] = {"$lte": filter_params.date_to}
+        if filter_params.category is not None:
+            query["category"] = filter_params.category
+
+        geo_near: dict[str, Any] = {
+            "near": GeoPoint.from_location(filter_params.near).model_dump(),
+            "key": "location",
+            "distanceField": "distance",
+            "spherical": True,
+            "maxDistance": filter_params.radius_km * 1000,
+            "query": query,
+        }
+
+        pipeline: list[dict] = [{"$geoNear": geo_near}]
+        if last_id is not None:
+            geo_near["minDistance"] = last_distance
+            pipeline.append(
+                {
+                    "$match": {
+                        "$or": [
+                            {"distance": {"$gt": last_distance}},
+                            {"distance": last_distance, "_id": {"$gt": last_id}},
+                        ],
+                    },
+                },
+            )
+        # $geoNear does not order events at the same distance by `_id`, so the keyset needs the sort.
+        # Followed by $limit, it is a top-k sort that only keeps limit + 1 events in memory
+        pipeline += [{"$sort": {"distance": 1, "_id": 1}}, {"$limit": filter_params.limit + 1}]
+        return pipeline
+
+    @staticmethod
+    async def search_events(filter_params: EventFilter) -> tuple[list[EventRead], str | None]:
+        """Search active, verified events near a point that overlap a time window.
+
+        Events are sorted by distance and ID, and pages are fetched by keyset:
+        the cursor holds the sort key of the last event of the previous page.
+
+        Args:
+            filter_params: Filter criteria
+
+        Returns:
+            Page of events matching criteria and the cursor of the next page, if any
+
+        Raises:
+            HTTPException (400): If the cursor is invalid
+        """
+        last_distance, last_id = None, None
+        if filter_params.cursor is not None:
+            last_distance, last_id = _parse_cursor(filter_params.cursor)
+
+        pipeline = EventService.build_search_pipeline(filter_params, last_distance, last_id)
+        cursor = search_collection(Event).aggregate([*pipeline, {"$project": EventRead.Settings.projection}])
+        events = [EventRead.model_validate(event) async for event in cursor]
+        if len(events) <= filter_params.limit:
+            return events, None
+        events = events[: filter_params.limit]
+        return events, encode_cursor({"d": events[-1].distance, "id": str(events[-1].id)})
+
+    @staticmethod
+    async def join_event(current_user: User, event_id: str) -> Event:
+        """Join an event, doing nothing if the user has already joined it.
+
+        The participation record is inserted first, not yet counted, and its
+        unique index makes repeated joins no-ops. The counter is then incremented
+        by one conditional update that only matches while the event has free
+        places, so concurrent joins never oversell and never wait on each other.
+        If it does not match, the record is removed again. Otherwise the record
+        is marked as counted, so a leave only decrements the counter for counted
+        records. If a leave removed the record in between, the increment is
+        undone.
+
+        Args:
+            current_user: User joining the event
+            event_id: Event ID
+
+        Returns:
+            Updated event
+
+        Raises:
+            HTTPException (404): If event not found
+            HTTPException (400): If the event has ended
+            HTTPException (409): If the event is full
+        """
+        event_oid = _parse_event_id(event_id)
+        try:
+            await EventParticipant(event_id=event_oid, user_id=current_user.id, counted=False).insert()
+        except DuplicateKeyError:
+            return await EventService.get_event_by_id(event_id)
+
+        participation = {"event_id": event_oid, "user_id": current_user.id}
+        event = await Event.find_one(
+            Event.id == event_oid,
+            Eq(Event.is_active, True),
+            GT(Event.end_date, datetime.now(timezone.utc)),
+            {"$expr": {"$lt": ["$participants_count", "$max_participants"]}},
+        ).update({"$inc": {"participants_count": 1}}, response_type=UpdateResponse.NEW_DOCUMENT)
+        if event is not None:
+            result = await EventParticipant.get_motor_collection().update_one(
+                participation,
+                {"$set": {"counted": True}},
+            )
+            if result.matched_count:
+                return event
+            # The user left before the record was counted, so the leave did not decrement
+            return await Event.find_one(Event.id == event_oid).update(
+                {"$inc": {"participants_count": -1}},
+                response_type=UpdateResponse.NEW_DOCUMENT,
+            )
+
+        await EventParticipant.get_motor_collection().delete_one(participation)
+        event = await EventService.get_event_by_id(event_id)
+        if as_utc(event.end_date) <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Event has ended",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Event is full",
+        )
+
+    @staticmethod
+    async def leave_event(current_user: User, event_id: str) -> Event:
+        """Leave an event, doing nothing if the user has not joined it.
+
+        The counter is only decremented if the removed record was counted, see
+        `join_event`.
+
+        Args:
+            current_user: User leaving the event
+            event_id: Event ID
+
+        Returns:
+            Updated event
+
+        Raises:
+            HTTPException (404): If event not found
+        """
+        event_oid = _parse_event_id(event_id)
+        record = await EventParticipant.get_motor_collection().find_one_and_delete(
+            {"event_id": event_oid, "user_id": current_user.id},
+            projection={"counted": 1},
+        )
+        if record is not None and record.get("counted", True):
+            await Event.find_one(Event.id == event_oid, GT(Event.participants_count, 0)).update(
+                {"$inc": {"participants_count": -1}},
+            )
+        return await EventService.get_event_by_id(event_id)
@@ -0,0 +1,328 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import secrets
+
+import numpy as np
+from fastapi import HTTPException, status
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.database import search_collection
+from app.core.models.user import User
+from app.core.services.profile_cache import CachedProfile
+from app.core.services.redis_service import RedisService
+from app.core.services.user_cache import UserCache
+
+from .schemas import UserRecommendationFilter
+from .service import UserInterests, UserService
+
+logger = logging.getLogger(__name__)
+
+# Deletes a refill lock only if it is still held by the refill that took it,
+# not by one that took it after it expired
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Extends a refill lock only if it is still held by the refill that took it
+EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class FeedService:
+    """Discovery feeds of candidates, ranked in advance and queued in Redis per user.
+
+    Like recommendations, a feed only has active users matching its filters
+    that share at least one interest with the user. A refill scans all of them
+    in batches of `FEED_REFILL_BATCH`, skips the ones the user has already seen
+    or has queued, scores the rest by interest similarity and keeps the best
+    ones over the whole scan, which are appended to the queue best first until
+    it holds `FEED_QUEUE_TARGET` IDs. Every ID queued by a refill scores at
+    least as high as every unseen candidate it leaves out, so the queue is
+    served best match first as long as interests don't change in between.
+
+    Serving a page pops IDs off the queue, marks them as seen and reads the
+    profiles from the profile cache. Once fewer than `FEED_LOW_WATER` IDs are
+    left, the queue is refilled by a background worker, so ranking stays off the
+    request path except for the first page after the filters or interests
+    change. A refill that finds fewer candidates than it could queue marks the
+    feed as exhausted for its filters and interests, and the feed is not scanned
+    again until the mark expires after `FEED_EXHAUSTED_TTL_SECONDS`, to pick up
+    users that joined since.
+    """
+
+    _refills: asyncio.Queue[str] | None = None
+    _scheduled: set[str] = set()
+    _worker: asyncio.Task | None = None
+
+    @staticmethod
+    def _queue_key(user_id: str) -> str:
+        return f"feed:{user_id}:queue"
+
+    @staticmethod
+    def _seen_key(user_id: str) -> str:
+        return f"feed:{user_id}:seen"
+
+    @staticmethod
+    def _state_key(user_id: str) -> str:
+        return f"feed:{user_id}:state"
+
+    @staticmethod
+    def _lock_key(user_id: str) -> str:
+        return f"feed:{user_id}:refilling"
+
+    @staticmethod
+    def _exhausted_key(user_id: str, fingerprint: str) -> str:
+        return f"feed:{user_id}:exhausted:{fingerprint}"
+
+    @staticmethod
+    def _fingerprint(user: User, filter_params: UserRecommendationFilter) -> str:
+        """Identify what a queue was ranked for, so it is rebuilt when filters or interests change."""
+        data = "\n".join([filter_params.model_dump_json(exclude={"limit"}), *sorted(user.interests)])
+        return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+    @classmethod
+    async def _pop(cls, user_id: str, fingerprint: str, count: int) -> tuple[str | None, list[str], int, bool]:
+        """Pop IDs off a queue.
+
+        Returns:
+            Fingerprint the queue was ranked for, popped IDs, number of IDs left and
+            whether the feed was scanned to the end for the given fingerprint
+        """
+        async with RedisService.client().pipeline(transaction=True) as pipe:
+            pipe.hget(cls._state_key(user_id), "fingerprint")
+            pipe.lpop(cls._queue_key(user_id), count)
+            pipe.llen(cls._queue_key(user_id))
+            pipe.exists(cls._exhausted_key(user_id, fingerprint))
+            stored, user_ids, remaining, exhausted = await pipe.execute()
+        return stored, user_ids or [], remaining, bool(exhausted)
+
+    @classmethod
+    async def _reset(cls, user_id: str, fingerprint: str, filter_params: UserRecommendationFilter):
+        """Empty a queue for new filters or interests, keeping what was seen."""
+        async with RedisService.client().pipeline(transaction=True) as pipe:
+            pipe.delete(cls._queue_key(user_id), cls._state_key(user_id), cls._exhausted_key(user_id, fingerprint))
+            pipe.hset(
+                cls._state_key(user_id),
+                mapping={
+                    "fingerprint": fingerprint,
+                    "filter": filter_params.model_dump_json(exclude={"limit"}),
+                },
+            )
+            pipe.expire(cls._state_key(user_id), settings.FEED_TTL_SECONDS)
+            await pipe.execute()
+
+    @classmethod
+    async def next_page(cls, current_user: User, filter_params: UserRecommendationFilter) -> list[CachedProfile]:
+        """Get the next page of a user's feed and mark its users as seen.
+
+        Args:
+            current_user: User whose feed to serve
+            filter_params: Candidate filter criteria, similarity measure and page size
+
+        Returns:
+            Profiles of the page, best match first, fewer than the limit once
+            every matching user was seen
+
+        Raises:
+            HTTPException (503): If the feed store is unavailable
+        """
+        try:
+            return await cls._next_page(current_user, filter_params)
+        except RedisError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Feed is unavailable, try again later",
+            ) from e
+
+    @classmethod
+    async def _next_page(cls, current_user: User, filter_params: UserRecommendationFilter) -> list[CachedProfile]:
+        user_id = str(current_user.id)
+        limit = filter_params.limit
+        fingerprint = cls._fingerprint(current_user, filter_params)
+
+        stored, user_ids, remaining, exhausted = await cls._pop(user_id, fingerprint, limit)
+        if stored != fingerprint:
+            # The popped IDs were ranked for other filters or interests
+            await cls._reset(user_id, fingerprint, filter_params)
+            user_ids, exhausted = [], False
+        if len(user_ids) < limit and not exhausted:
+            await cls.refill(user_id, current_user, wait=True)
+            _, more, remaining, exhausted = await cls._pop(user_id, fingerprint, limit - len(user_ids))
+            user_ids += more
+        if remaining < settings.FEED_LOW_WATER and not exhausted:
+            cls._schedule(user_id)
+        if not user_ids:
+            return []
+
+        async with RedisService.client().pipeline(transaction=False) as pipe:
+            pipe.sadd(cls._seen_key(user_id), *user_ids)
+            pipe.expire(cls._seen_key(user_id), settings.FEED_SEEN_TTL_SECONDS)
+            pipe.expire(cls._queue_key(user_id), settings.FEED_TTL_SECONDS)
+            pipe.expire(cls._state_key(user_id), settings.FEED_TTL_SECONDS)
+            await pipe.execute()
+        profiles, _ = await UserService.get_user_profiles(user_ids)
+        return profiles
+
+    @classmethod
+    async def refill(cls, user_id: str, user: User | None = None, wait: bool = False):
+        """Rank the unseen candidates of a feed and append the best ones to its queue.
+
+        Fills the queue up to `FEED_QUEUE_TARGET` IDs. Does nothing if the feed
+        was reset or expired, or is exhausted for its filters and interests.
+
+        Args:
+            user_id: User ID of the feed
+            user: User of the feed, loaded from the user cache if not given
+            wait: Whether to wait up to `FEED_REFILL_WAIT_SECONDS` for a refill in
+                progress to finish, rather than leave the feed to it
+
+        Raises:
+            RedisError: If the feed store is unavailable
+        """
+        client = RedisService.client()
+        token = secrets.token_hex(16)
+        if not await cls._lock(user_id, token, wait):
+            return
+        try:
+            state = await client.hgetall(cls._state_key(user_id))
+            user = user or await UserCache.get_user(user_id)
+            if not state or user is None:
+                return
+            fingerprint = state["fingerprint"]
+            if await client.exists(cls._exhausted_key(user_id, fingerprint)):
+                return
+            queued = set(await client.lrange(cls._queue_key(user_id), 0, -1))
+            wanted = settings.FEED_QUEUE_TARGET - len(queued)
+            if wanted <= 0:
+                return
+            if not user.interests:
+                await cls._append(user_id, fingerprint, [], exhausted=True)
+                return
+
+            filter_params = UserRecommendationFilter.model_validate_json(state["filter"])
+            query = UserService.build_candidate_query(user, filter_params, interests=user.interests)
+            best_ids: list[str] = []
+            best_scores = np.empty(0)
+            last_id = None
+            while True:
+                batch_query = query if last_id is None else {"$and": [query, {"_id": {"$gt": last_id}}]}
+                cursor = search_collection(User).find(
+                    batch_query,
+                    UserInterests.Settings.projection,
+                    sort=[("_id", 1)],
+                    limit=settings.FEED_REFILL_BATCH,
+                )
+                batch = [UserInterests.model_validate(candidate) async for candidate in cursor]
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                candidates = [candidate for candidate in batch if str(candidate.id) not in queued]
+                if candidates:
+                    seen = await client.smismember(cls._seen_key(user_id), [str(c.id) for c in candidates])
+                    candidates = [candidate for candidate, is_seen in zip(candidates, seen, strict=True) if not is_seen]
+                if candidates:
+                    # The best candidates so far come first, so they win ties with later ones
+                    scores = await UserService.score_candidates(user.interests, candidates, filter_params.method)
+                    ids = best_ids + [str(candidate.id) for candidate in candidates]
+                    scores = np.concatenate([best_scores, scores])
+                    best = np.argsort(-scores, kind="stable")[:wanted]
+                    best = best[scores[best] > 0]
+                    best_ids, best_scores = [ids[i] for i in best], scores[best]
+
+                if len(batch) < settings.FEED_REFILL_BATCH:
+                    break
+                await client.eval(EXTEND_SCRIPT, 1, cls._lock_key(user_id), token, settings.FEED_REFILL_LOCK_SECONDS)
+
+            # Fewer candidates than wanted means every remaining one is queued
+            await cls._append(user_id, fingerprint, best_ids, exhausted=len(best_ids) < wanted)
+        finally:
+            await client.eval(RELEASE_SCRIPT, 1, cls._lock_key(user_id), token)
+
+    @classmethod
+    async def _lock(cls, user_id: str, token: str, wait: bool) -> bool:
+        """Take the refill lock of a feed, waiting for it if asked to.
+
+        Returns:
+            Whether the lock was taken
+        """
+        client = RedisService.client()
+        deadline = asyncio.get_running_loop().time() + settings.FEED_REFILL_WAIT_SECONDS
+        while not await client.set(cls._lock_key(user_id), token, nx=True, ex=settings.FEED_REFILL_LOCK_SECONDS):
+            if not wait or asyncio.get_running_loop().time() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    @classmethod
+    async def _append(cls, user_id: str, fingerprint: str, user_ids: list[str], exhausted: bool) -> bool:
+        """Append ranked IDs to a queue, marking the feed exhausted if asked to.
+
+        Returns:
+            False if the feed was reset for other filters or interests meanwhile
+        """
+
+        async def append(pipe: Pipeline) -> bool:
+            if await pipe.hget(cls._state_key(user_id), "fingerprint") != fingerprint:
+                return False
+            pipe.multi()
+            if user_ids:
+                pipe.rpush(cls._queue_key(user_id), *user_ids)
+            pipe.expire(cls._queue_key(user_id), settings.FEED_TTL_SECONDS)
+            if exhausted:
+                pipe.set(cls._exhausted_key(user_id, fingerprint), "1", ex=settings.FEED_EXHAUSTED_TTL_SECONDS)
+            return True
+
+        # Serving a page refreshes the TTL of the state, so the transaction is retried until it goes through
+        return await RedisService.client().transaction(append, cls._state_key(user_id), value_from_callable=True)
+
+    @classmethod
+    def _schedule(cls, user_id: str):
+        """Queue a feed for a background refill, unless it already is."""
+        if cls._refills is None or user_id in cls._scheduled:
+            return
+        try:
+            cls._refills.put_nowait(user_id)
+        except asyncio.QueueFull:
+            logger.warning("Feed refill queue is full, the feed of user %s is refilled on its next page", user_id)
+            return
+        cls._scheduled.add(user_id)
+
+    @classmethod
+    async def _work(cls, refills: asyncio.Queue[str]):
+        while True:
+            user_id = await refills.get()
+            cls._scheduled.discard(user_id)
+            try:
+                await cls.refill(user_id)
+            except Exception:
+                logger.exception("Failed to refill the feed of user %s", user_id)
+
+    @classmethod
+    def start(cls):
+        """Start the background worker that refills feeds."""
+        if cls._worker is None:
+            cls._refills = asyncio.Queue(maxsize=settings.FEED_REFILL_QUEUE_SIZE)
+            cls._worker = asyncio.create_task(cls._work(cls._refills))
+
+    @classmethod
+    async def stop(cls):
+        """Stop the background worker, dropping the feeds waiting for a refill."""
+        if cls._worker is not None:
+            cls._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cls._worker
+            cls._worker = None
+            cls._refills = None
+            cls._scheduled.clear()
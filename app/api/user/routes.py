@@ -1,11 +1,27 @@
+import json
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Header, Query, Response, UploadFile
 
 from app.api.auth.dependencies import get_current_user
 from app.core.models.user import User
-
-from .schemas import UserFilter, UserResponse, UserUpdate
+from app.core.utils.etag import json_response
+from app.core.utils.responses import trusted_json_response
+
+from .feed import FeedService
+from .schemas import (
+    PictureUploadConfirm,
+    PictureUploadRequest,
+    PictureUploadResponse,
+    UserBatchFilter,
+    UserBatchResponse,
+    UserFilter,
+    UserRecommendation,
+    UserRecommendationFilter,
+    UserResponse,
+    UserSearchResponse,
+    UserUpdate,
+)
 from .service import UserService
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -33,25 +49,84 @@ async def update_current_user(
     return await UserService.update_user(current_user, user_update)
 
 
-@router.get("/", response_model=list[UserResponse])
+@router.get("/", response_model=UserSearchResponse)
 async def find_users(
     current_user: Annotated[User, Depends(get_current_user)],
     filter_params: Annotated[UserFilter, Query(..., description="Filter parameters")],
 ):
-    """Search users with filters."""
-    return await UserService.search_users(
+    """Search users with filters.
+
+    Pass `next_cursor` of the response as `cursor` to get the next page.
+    Returns status code 400 if cursor is invalid.
+    """
+    users, next_cursor = await UserService.search_users(
         filter_params=filter_params,
         current_user_id=current_user.id,
     )
+    page = UserSearchResponse.model_construct(users=users, next_cursor=next_cursor)
+    return trusted_json_response(page, UserSearchResponse)
+
+
+@router.get("/recommendations", response_model=list[UserRecommendation])
+async def recommend_users(
+    current_user: Annotated[User, Depends(get_current_user)],
+    filter_params: Annotated[UserRecommendationFilter, Query(..., description="Filter parameters")],
+):
+    """Recommend users ranked by interest similarity with the current user.
+
+    Returns an empty list if the current user has no interests.
+    """
+    recommendations = await UserService.recommend_users(current_user, filter_params)
+    return trusted_json_response(recommendations, list[UserRecommendation])
+
+
+@router.get("/feed", response_model=list[UserResponse])
+async def get_feed(
+    current_user: Annotated[User, Depends(get_current_user)],
+    filter_params: Annotated[UserRecommendationFilter, Query(..., description="Filter parameters")],
+):
+    """Get the next page of the discovery feed of the current user.
+
+    Like recommendations, the feed has users sharing at least one interest with
+    the current user, served best match first and every one once. Changing the
+    filters or interests starts the feed over, still without users that were
+    already served. Returns an empty list once every matching user was served,
+    until the feed is ranked again for users that joined since.
+    Returns status code 503 if the feed is unavailable.
+    """
+    profiles = await FeedService.next_page(current_user, filter_params)
+    return Response(content=f"[{','.join(profile.content for profile in profiles)}]", media_type="application/json")
+
+
+@router.get("/batch", response_model=UserBatchResponse)
+async def get_user_profiles(
+    _: Annotated[User, Depends(get_current_user)],
+    filter_params: Annotated[UserBatchFilter, Query(..., description="User IDs")],
+):
+    """Get the profiles of several users by ID at once, in the order of the IDs.
+
+    IDs of users that don't exist are listed in `missing` instead of failing the request.
+    Returns status code 422 if no IDs or more than `USER_BATCH_MAX_IDS` are given.
+    """
+    profiles, missing = await UserService.get_user_profiles(filter_params.ids)
+    # Profiles are cached serialized, so the response is assembled from them as they are
+    users = ",".join(profile.content for profile in profiles)
+    return Response(content=f'{{"users":[{users}],"missing":{json.dumps(missing)}}}', media_type="application/json")
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user_profile(user_id: str, _: Annotated[User, Depends(get_current_user)]):
+async def get_user_profile(
+    user_id: str,
+    _: Annotated[User, Depends(get_current_user)],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
     """Get the profile of another user by ID.
 
     Returns status code 404 if user is not found.
+    Returns status code 304 if `If-None-Match` matches the current ETag.
     """
-    return await UserService.get_user_by_id(user_id)
+    profile = await UserService.get_user_profile(user_id)
+    return json_response(profile.content, profile.etag, if_none_match)
 
 
 @router.post("/me/picture", response_model=UserResponse)
@@ -59,5 +134,34 @@ async def upload_profile_picture(
     current_user: Annotated[User, Depends(get_current_user)],
     file: UploadFile = File(...),
 ):
-    """Upload a profile picture to AWS S3."""
+    """Upload a profile picture, stored as resized copies in AWS S3.
+
+    Returns status code 400 if the file is not a JPEG, PNG or WebP image.
+    Returns status code 413 if the file is too large.
+    """
     return await UserService.upload_profile_picture(current_user, file)
+
+
+@router.post("/me/picture/upload", response_model=PictureUploadResponse)
+async def create_picture_upload(
+    upload_request: PictureUploadRequest,
+    current_user: Annotated[User, Depends(get_current_user)],
+):
+    """Get a presigned form for uploading a profile picture directly to AWS S3.
+
+    POST the returned `fields` and then the picture as `file` to `url` as
+    multipart/form-data, then pass `key` to `/users/me/picture/confirm`.
+    """
+    return UserService.create_picture_upload(current_user, upload_request)
+
+
+@router.post("/me/picture/confirm", response_model=UserResponse)
+async def confirm_picture_upload(
+    upload_confirm: PictureUploadConfirm,
+    current_user: Annotated[User, Depends(get_current_user)],
+):
+    """Add a picture uploaded directly to AWS S3 to the profile, as resized copies.
+
+    Returns status code 400 if the key is invalid, the picture was not uploaded or it is not an image.
+    """
+    return await UserService.confirm_picture_upload(current_user, upload_confirm)
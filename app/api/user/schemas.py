@@ -1,10 +1,14 @@
 import re
 from datetime import date, datetime
+from enum import Enum
+from typing import Literal
 
 from beanie import PydanticObjectId
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 
 from app.config import settings
+from app.core.models.location import Location
+from app.core.models.photo import Photo
 from app.core.models.user import Gender
 
 PASSWORD_REGEX = re.compile(settings.PASSWORD_PATTERN)
@@ -23,7 +27,7 @@ class UserUpdate(BaseModel):
     gender: Gender | None = None
     bio: str | None = None
     interests: list[str] | None = None
-    location: str | None = None
+    location: Location | None = None
 
     @field_validator("password")
     @classmethod
@@ -46,13 +50,65 @@ class UserResponse(BaseModel):
     gender: Gender | None
     bio: str | None
     interests: list[str]
-    location: str | None
+    location: Location | None
     photo_urls: list[str]
+    photos: list[Photo] = Field(default_factory=list)
     verified: bool
     is_active: bool
     created_at: datetime
     updated_at: datetime
 
+    @field_validator("location", mode="before")
+    @classmethod
+    def convert_geojson_location(cls, v):
+        """Convert the stored GeoJSON point to latitude and longitude."""
+        return Location.from_geojson(v)
+
+
+class PictureUploadRequest(BaseModel):
+    """Schema for requesting a direct profile picture upload."""
+
+    content_type: Literal["image/jpeg", "image/png", "image/webp"]
+
+
+class PictureUploadResponse(BaseModel):
+    """Schema for a presigned profile picture upload."""
+
+    url: str = Field(description="URL to send a multipart/form-data POST to")
+    fields: dict[str, str] = Field(description="Form fields to send before the `file` field")
+    key: str = Field(description="Key of the picture, to pass to the confirm endpoint")
+    expires_in: int = Field(description="Seconds until the upload URL expires")
+
+
+class PictureUploadConfirm(BaseModel):
+    """Schema for confirming a direct profile picture upload."""
+
+    key: str
+
+
+class UserSearchResponse(BaseModel):
+    """Schema for a page of user search results."""
+
+    users: list[UserResponse]
+    next_cursor: str | None = Field(default=None, description="Cursor of the next page, null on the last page")
+
+
+class UserBatchFilter(BaseModel):
+    """Schema for fetching several user profiles at once."""
+
+    ids: list[str] = Field(
+        min_length=1,
+        max_length=settings.USER_BATCH_MAX_IDS,
+        description="User IDs, repeat the parameter for each one",
+    )
+
+
+class UserBatchResponse(BaseModel):
+    """Schema for several user profiles."""
+
+    users: list[UserResponse] = Field(description="Profiles of the found users, in the order of their IDs")
+    missing: list[str] = Field(description="IDs of users that were not found")
+
 
 class UserFilter(BaseModel):
     """Schema for filtering users."""
@@ -61,8 +117,103 @@ class UserFilter(BaseModel):
     max_age: int | None = Field(default=None, description="Maximum age")
     gender: Gender | None = Field(default=None, description="Filter by gender")
     interests: list[str] | None = Field(default=None, description="Filter by interests")
-    location: str | None = Field(default=None, description="Filter by location")
+    latitude: float | None = Field(default=None, ge=-90, le=90, description="Latitude to search near")
+    longitude: float | None = Field(default=None, ge=-180, le=180, description="Longitude to search near")
+    radius_km: float | None = Field(default=None, gt=0, description="Maximum distance in kilometers")
+    min_latitude: float | None = Field(
+        default=None,
+        ge=-90,
+        le=90,
+        description="Latitude of the south corners of the bounding box. The south edge is the great circle arc "
+        "between them, not the parallel, so it bulges towards the equator",
+    )
+    min_longitude: float | None = Field(default=None, ge=-180, le=180, description="Bounding box west edge")
+    max_latitude: float | None = Field(
+        default=None,
+        ge=-90,
+        le=90,
+        description="Latitude of the north corners of the bounding box. The north edge is the great circle arc "
+        "between them, not the parallel, so it bulges towards the equator",
+    )
+    max_longitude: float | None = Field(
+        default=None,
+        ge=-180,
+        le=180,
+        description="Bounding box east edge, less than 180 degrees east of the west edge",
+    )
     verified: bool | None = Field(default=None, description="Filter by verified status")
 
-    skip: int = Field(default=0, ge=0, description="Number of records to skip")
+    cursor: str | None = Field(default=None, description="Cursor of the page to fetch, from `next_cursor`")
     limit: int = Field(default=100, ge=1, le=100, description="Maximum number of records")
+
+    @model_validator(mode="after")
+    def validate_location(self) -> "UserFilter":
+        """Validate that location parameters are given together."""
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        if self.radius_km is not None and self.latitude is None:
+            raise ValueError("radius_km requires latitude and longitude")
+        box = (self.min_latitude, self.min_longitude, self.max_latitude, self.max_longitude)
+        if any(v is not None for v in box) and any(v is None for v in box):
+            raise ValueError("min_latitude, min_longitude, max_latitude and max_longitude must be given together")
+        min_latitude, min_longitude, max_latitude, max_longitude = box
+        if min_latitude is not None and max_latitude is not None and min_latitude >= max_latitude:
+            raise ValueError("min_latitude must be less than max_latitude")
+        if min_longitude is not None and max_longitude is not None:
+            if min_longitude >= max_longitude:
+                raise ValueError("min_longitude must be less than max_longitude")
+            # MongoDB only accepts polygons that fit in a hemisphere
+            if max_longitude - min_longitude >= 180:
+                raise ValueError("Bounding box must span less than 180 degrees of longitude")
+        return self
+
+    @property
+    def near(self) -> Location | None:
+        """Point to sort results by distance from, if given."""
+        if self.latitude is None or self.longitude is None:
+            return None
+        return Location(latitude=self.latitude, longitude=self.longitude)
+
+    @property
+    def has_box(self) -> bool:
+        """Whether results should be limited to a bounding box."""
+        return self.min_latitude is not None
+
+
+class MatchMethod(str, Enum):
+    """Interest similarity measure."""
+
+    JACCARD = "jaccard"
+    CATEGORY = "category"
+
+
+class UserRecommendationFilter(BaseModel):
+    """Schema for filtering recommendation candidates."""
+
+    min_age: int | None = Field(default=None, description="Minimum age")
+    max_age: int | None = Field(default=None, description="Maximum age")
+    gender: Gender | None = Field(default=None, description="Filter by gender")
+    latitude: float | None = Field(default=None, ge=-90, le=90, description="Latitude to search near")
+    longitude: float | None = Field(default=None, ge=-180, le=180, description="Longitude to search near")
+    radius_km: float | None = Field(default=None, gt=0, description="Maximum distance in kilometers")
+    verified: bool | None = Field(default=None, description="Filter by verified status")
+
+    method: MatchMethod = Field(
+        default=MatchMethod.JACCARD,
+        description="`jaccard` counts every interest equally, `category` weighs every category equally",
+    )
+    limit: int = Field(default=20, ge=1, le=100, description="Maximum number of records")
+
+    @model_validator(mode="after")
+    def validate_location(self) -> "UserRecommendationFilter":
+        """Validate that location parameters are given together."""
+        if len({self.latitude is None, self.longitude is None, self.radius_km is None}) > 1:
+            raise ValueError("latitude, longitude and radius_km must be given together")
+        return self
+
+
+class UserRecommendation(BaseModel):
+    """Schema for a recommended user."""
+
+    user: UserResponse
+    score: float = Field(description="Interest similarity, from 0 to 1")
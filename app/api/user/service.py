@@ -1,59 +1,231 @@
+import asyncio
 import uuid
+from collections.abc import Mapping
 from datetime import date, datetime, timedelta, timezone
+from io import BytesIO
+from typing import Any
 
-import boto3
+import numpy as np
 from beanie import PydanticObjectId
-from beanie.operators import GTE, LTE, And, In, Or
-from botocore.config import Config as BotoConfig
+from beanie.odm.queries.find import FindMany
+from beanie.odm.queries.update import UpdateResponse
+from beanie.operators import GTE, LTE, And, Eq, In
+from bson.errors import InvalidId
 from fastapi import HTTPException, UploadFile, status
+from pydantic import BaseModel, Field
+from pymongo.errors import DuplicateKeyError
 
-from app.api.auth.dependencies import get_password_hash
+from app.api.user_interest.service import UserInterestService
 from app.config import settings
+from app.core.database import search_collection
+from app.core.models.location import GeoPoint, Location
+from app.core.models.photo import Photo, PhotoDerivative
 from app.core.models.user import User
+from app.core.services.image_service import ImageService
+from app.core.services.password_service import PasswordService
+from app.core.services.profile_cache import CachedProfile, ProfileCache
+from app.core.services.storage_service import MB, StorageService
+from app.core.services.user_cache import UserCache
 from app.core.utils.age import get_age
+from app.core.utils.cursor import decode_cursor, encode_cursor
+from app.core.utils.image import sniff_image_type
+from app.core.utils.responses import trusted_json
 
-from .schemas import UserFilter, UserUpdate
-
-s3_client = boto3.client(
-    "s3",
-    endpoint_url=settings.AWS_S3_ENDPOINT_URL,
-    aws_access_key_id=settings.AWS_S3_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_S3_SECRET_ACCESS_KEY,
-    config=BotoConfig(
-        retries={
-            "max_attempts": 3,
-            "mode": "standard",
-        },
-        connect_timeout=5,
-        read_timeout=10,
-        region_name=settings.AWS_S3_REGION,
-    ),
+from .schemas import (
+    MatchMethod,
+    PictureUploadConfirm,
+    PictureUploadRequest,
+    PictureUploadResponse,
+    UserFilter,
+    UserRecommendation,
+    UserRecommendationFilter,
+    UserResponse,
+    UserUpdate,
 )
 
+EARTH_RADIUS_KM = 6378.1
+
+PICTURE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+# Part of profile ETags, bump it when `UserResponse` changes so clients don't keep the old shape
+PROFILE_VERSION = 1
+
+# Age in full years, computed by MongoDB the same way as `get_age`
+AGE_EXPRESSION = {
+    "$cond": [
+        {"$eq": [{"$type": "$birth_date"}, "date"]},
+        {
+            "$subtract": [
+                {"$subtract": [{"$year": "$$NOW"}, {"$year": "$birth_date"}]},
+                {
+                    "$cond": [
+                        {
+                            "$lt": [
+                                {"$dateToString": {"format": "%m-%d", "date": "$$NOW"}},
+                                {"$dateToString": {"format": "%m-%d", "date": "$birth_date"}},
+                            ],
+                        },
+                        1,
+                        0,
+                    ],
+                },
+            ],
+        },
+        None,
+    ],
+}
+
+LOCATION_EXPRESSION = {
+    "$cond": [
+        {"$ifNull": ["$location.coordinates", False]},
+        {
+            "latitude": {"$arrayElemAt": ["$location.coordinates", 1]},
+            "longitude": {"$arrayElemAt": ["$location.coordinates", 0]},
+        },
+        None,
+    ],
+}
+
+
+class UserRead(UserResponse):
+    """User profile read model.
+
+    MongoDB returns only the fields of `UserResponse`, with `age` and `location`
+    already computed, so rows are validated once and never become `User` documents.
+    """
+
+    distance: float | None = Field(default=None, exclude=True)
+
+    class Settings:
+        """Projection of the read model."""
+
+        projection = {
+            "_id": 0,
+            "id": "$_id",
+            "username": 1,
+            "email": 1,
+            "name": 1,
+            "birth_date": 1,
+            "age": AGE_EXPRESSION,
+            "gender": 1,
+            "bio": 1,
+            "interests": 1,
+            "location": LOCATION_EXPRESSION,
+            "photo_urls": 1,
+            "photos": 1,
+            "verified": 1,
+            "is_active": 1,
+            "created_at": 1,
+            "updated_at": 1,
+            "distance": 1,
+        }
+
+
+class UserInterests(BaseModel):
+    """Interests of a recommendation candidate."""
+
+    id: PydanticObjectId = Field(alias="_id")
+    interests: list[str]
+
+    class Settings:
+        """Projection of the candidate model."""
+
+        projection = {"_id": 1, "interests": 1}
+
+
+def _serialize_profile(user: UserRead) -> CachedProfile:
+    """Serialize a user profile as `UserResponse`, with an ETag that changes with `updated_at`."""
+    # `age` changes on birthdays without an update, so it is part of the version
+    etag = f'"{PROFILE_VERSION}-{user.updated_at:%Y%m%d%H%M%S%f}-{user.age}"'
+    return CachedProfile(content=trusted_json(user, UserResponse).decode(), etag=etag)
+
+
+def _bounding_box(filter_params: UserFilter) -> dict:
+    """Build a GeoJSON polygon from the bounding box of a filter."""
+    south, west = filter_params.min_latitude, filter_params.min_longitude
+    north, east = filter_params.max_latitude, filter_params.max_longitude
+    return {
+        "type": "Polygon",
+        "coordinates": [[[west, south], [east, south], [east, north], [west, north], [west, south]]],
+    }
+
+
+def _upload_key_prefix(user_id: PydanticObjectId) -> str:
+    """Get the S3 key prefix of the pictures a user uploads directly."""
+    return f"uploads/{user_id}_"
+
+
+def _parse_cursor(cursor: str, by_distance: bool) -> tuple[float | None, PydanticObjectId]:
+    """Get the distance and ID of the last seen user from a page cursor."""
+    try:
+        values = decode_cursor(cursor)
+        last_id = PydanticObjectId(values["id"])
+        distance = float(values["d"]) if by_distance else None
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+    return distance, last_id
+
 
 class UserService:
     """Service for users."""
 
     @staticmethod
-    async def get_user_by_id(user_id: str) -> User:
-        """Get a user by ID.
+    async def _load_profile(user_id: str) -> CachedProfile | None:
+        """Load a user profile from the database and serialize it."""
+        user = await User.find_one(User.id == PydanticObjectId(user_id)).project(UserRead)
+        return None if user is None else _serialize_profile(user)
+
+    @staticmethod
+    async def _load_profiles(user_ids: list[str]) -> dict[str, CachedProfile]:
+        """Load user profiles from the database in one query and serialize them."""
+        query = User.find(In(User.id, [PydanticObjectId(user_id) for user_id in user_ids])).project(UserRead)
+        return {str(user.id): _serialize_profile(user) async for user in query}
+
+    @staticmethod
+    async def get_user_profile(user_id: str) -> CachedProfile:
+        """Get the serialized profile of a user by ID, through the profile cache.
 
         Args:
             user_id: User ID to find
 
         Returns:
-            User object
+            Profile serialized as `UserResponse`, with an ETag that changes with `updated_at`
 
         Raises:
             HTTPException (404): If user not found
         """
-        user = await User.get(user_id)
-        if not user:
+        profile = None
+        if PydanticObjectId.is_valid(user_id):
+            # The cache is keyed by the canonical form of IDs, which invalidations use
+            user_id = str(PydanticObjectId(user_id))
+            profile = await ProfileCache.get(user_id, lambda: UserService._load_profile(user_id))
+        if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
-        return user
+        return profile
+
+    @staticmethod
+    async def get_user_profiles(user_ids: list[str]) -> tuple[list[CachedProfile], list[str]]:
+        """Get the serialized profiles of several users by ID, through the profile cache.
+
+        Profiles missing from the cache are loaded in one query.
+
+        Args:
+            user_ids: User IDs to find, repeated ones are only looked up once
+
+        Returns:
+            Profiles in the order of their IDs, and the IDs of users that were not found
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        keys = {user_id: str(PydanticObjectId(user_id)) for user_id in user_ids if PydanticObjectId.is_valid(user_id)}
+        profiles: dict[str, CachedProfile] = {}
+        if keys:
+            profiles = await ProfileCache.get_many(list(dict.fromkeys(keys.values())), UserService._load_profiles)
+        found = [profiles[keys[user_id]] for user_id in user_ids if keys.get(user_id) in profiles]
+        missing = [user_id for user_id in user_ids if keys.get(user_id) not in profiles]
+        return found, missing
 
     @staticmethod
     async def update_user(current_user: User, user_update: UserUpdate) -> User:
@@ -67,20 +239,17 @@ class UserService:
             Updated user
 
         Raises:
-            HTTPException (400): If phone number already exists
+            HTTPException (400): If the username or email already exists, or the user is under 18
+            HTTPException (404): If the user was deleted meanwhile
+            HTTPException (503): If the password hashing pool is saturated
         """
         update_data = user_update.model_dump(exclude_unset=True)
 
-        if "username" in update_data or "email" in update_data:
-            user = await User.find_one(Or(User.username == update_data["username"], User.email == update_data["email"]))
-            if user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username or email already exists",
-                )
         if "password" in update_data:
-            update_data["password_hash"] = get_password_hash(update_data["password"])
+            update_data["password_hash"] = await PasswordService.hash_password(update_data["password"])
             del update_data["password"]
+        if user_update.location is not None:
+            update_data["location"] = GeoPoint.from_location(user_update.location).model_dump()
         if "birth_date" in update_data:
             age = get_age(update_data["birth_date"])
             if age < 18:
@@ -91,29 +260,43 @@ class UserService:
 
         if update_data:
             update_data["updated_at"] = datetime.now(timezone.utc)
-            await current_user.update({"$set": update_data})
+            # `Document.update` turns duplicate key errors into revision errors, so the query is updated instead
+            try:
+                updated_user = await User.find_one(User.id == current_user.id).update(
+                    {"$set": update_data},
+                    response_type=UpdateResponse.NEW_DOCUMENT,
+                )
+            except DuplicateKeyError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Username or email already exists",
+                ) from e
+            if updated_user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found",
+                )
+            current_user = updated_user
+            await UserCache.set_user(current_user)
+            await ProfileCache.invalidate(str(current_user.id))
 
         return current_user
 
     @staticmethod
-    async def search_users(
+    def build_search_query(
         filter_params: UserFilter,
-        skip: int = 0,
-        limit: int = 100,
         current_user_id: PydanticObjectId | None = None,
-    ) -> list[User]:
-        """Search users with filters.
+    ) -> FindMany[User]:
+        """Build the query of active users matching filters, without ordering or paging.
 
         Args:
             filter_params: Filter criteria
-            skip: Number of records to skip
-            limit: Maximum number of records to return
             current_user_id: Current user ID to exclude from results
 
         Returns:
-            List of users matching criteria
+            Find query
         """
-        query_conditions = []
+        query_conditions = [Eq(User.is_active, True)]
 
         today = date.today()
 
@@ -127,32 +310,370 @@ class UserService:
             query_conditions.append(User.gender == filter_params.gender)
         if filter_params.interests is not None:
             query_conditions.append(In(User.interests, filter_params.interests))
-        if filter_params.location is not None:
-            query_conditions.append(User.location == filter_params.location)
+        if filter_params.has_box:
+            query_conditions.append({"location": {"$geoWithin": {"$geometry": _bounding_box(filter_params)}}})
         if filter_params.verified is not None:
             query_conditions.append(User.verified == filter_params.verified)
 
-        query = And(*query_conditions) if query_conditions else {}
-
-        users_query = User.find(query)
+        users_query = User.find(And(*query_conditions))
 
         if current_user_id is not None:
             users_query = users_query.find(User.id != current_user_id)
 
-        return await users_query.skip(skip).limit(limit).to_list()
+        return users_query
+
+    @staticmethod
+    def build_geo_pipeline(
+        filter_params: UserFilter,
+        near: Location,
+        query: Mapping[str, Any],
+        last_distance: float | None = None,
+        last_id: PydanticObjectId | None = None,
+    ) -> list[dict]:
+        """Build the aggregation pipeline of users sorted by distance from a point.
+
+        Args:
+            filter_params: Filter criteria
+            near: Point to sort by distance from
+            query: Filter query from `build_search_query`
+            last_distance: Distance of the last user of the previous page
+            last_id: ID of the last user of the previous page
+
+        Returns:
+            Aggregation pipeline that returns one more user than the page size
+        """
+        geo_near: dict[str, Any] = {
+            "near": GeoPoint.from_location(near).model_dump(),
+            "key": "location",
+            "distanceField": "distance",
+            "spherical": True,
+            "query": query,
+        }
+        if filter_params.radius_km is not None:
+            geo_near["maxDistance"] = filter_params.radius_km * 1000
+
+        pipeline: list[dict] = [{"$geoNear": geo_near}]
+        if last_id is not None:
+            geo_near["minDistance"] = last_distance
+            pipeline.append(
+                {
+                    "$match": {
+                        "$or": [
+                            {"distance": {"$gt": last_distance}},
+                            {"distance": last_distance, "_id": {"$gt": last_id}},
+                        ],
+                    },
+                },
+            )
+        # $geoNear does not order users at the same distance by `_id`, so the keyset needs the sort.
+        # Followed by $limit, it is a top-k sort that only keeps limit + 1 users in memory
+        pipeline += [{"$sort": {"distance": 1, "_id": 1}}, {"$limit": filter_params.limit + 1}]
+        return pipeline
+
+    @staticmethod
+    async def search_users(
+        filter_params: UserFilter,
+        current_user_id: PydanticObjectId | None = None,
+    ) -> tuple[list[UserRead], str | None]:
+        """Search active users with filters.
+
+        Users are sorted by ID, or by distance and ID if a point is given. Pages
+        are fetched by keyset: the cursor holds the sort key of the last user of
+        the previous page, so deep pages cost as much as the first one.
+        Reads use `MONGO_SEARCH_READ_PREFERENCE`, so with secondaries results may
+        lag writes by up to `MONGO_MAX_STALENESS_SECONDS`.
+
+        Args:
+            filter_params: Filter criteria
+            current_user_id: Current user ID to exclude from results
+
+        Returns:
+            Page of users matching criteria and the cursor of the next page, if any
+
+        Raises:
+            HTTPException (400): If the cursor is invalid
+        """
+        users_query = UserService.build_search_query(filter_params, current_user_id)
+
+        near = filter_params.near
+        limit = filter_params.limit
+        last_distance, last_id = None, None
+        if filter_params.cursor is not None:
+            last_distance, last_id = _parse_cursor(filter_params.cursor, by_distance=near is not None)
+
+        if near is None:
+            if last_id is not None:
+                users_query = users_query.find(User.id > last_id)
+            cursor = search_collection(User).find(
+                users_query.get_filter_query(),
+                UserRead.Settings.projection,
+                sort=[("_id", 1)],
+                limit=limit + 1,
+            )
+            users = [UserRead.model_validate(user) async for user in cursor]
+            if len(users) <= limit:
+                return users, None
+            users = users[:limit]
+            return users, encode_cursor({"id": str(users[-1].id)})
+
+        pipeline = UserService.build_geo_pipeline(
+            filter_params,
+            near,
+            users_query.get_filter_query(),
+            last_distance,
+            last_id,
+        )
+        cursor = search_collection(User).aggregate([*pipeline, {"$project": UserRead.Settings.projection}])
+        users = [UserRead.model_validate(user) async for user in cursor]
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, encode_cursor({"d": users[-1].distance, "id": str(users[-1].id)})
+
+    @staticmethod
+    def build_candidate_query(
+        current_user: User,
+        filter_params: UserRecommendationFilter,
+        interests: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Build the filter query of active users a user could be recommended.
+
+        Args:
+            current_user: User to recommend to, excluded from the candidates
+            filter_params: Candidate filter criteria
+            interests: Only include candidates sharing at least one of these interests
+
+        Returns:
+            Filter query
+        """
+        search_filter = UserFilter(
+            min_age=filter_params.min_age,
+            max_age=filter_params.max_age,
+            gender=filter_params.gender,
+            interests=interests,
+            verified=filter_params.verified,
+        )
+        users_query = UserService.build_search_query(search_filter, current_user.id)
+        if filter_params.latitude is not None and filter_params.longitude is not None:
+            # $centerSphere takes the radius in radians
+            radius = filter_params.radius_km / EARTH_RADIUS_KM
+            center = [filter_params.longitude, filter_params.latitude]
+            users_query = users_query.find({"location": {"$geoWithin": {"$centerSphere": [center, radius]}}})
+        return users_query.get_filter_query()
+
+    @staticmethod
+    async def score_candidates(
+        interests: list[str],
+        candidates: list[UserInterests],
+        method: MatchMethod,
+    ) -> np.ndarray:
+        """Score the interest similarity of candidates with a user at once, as bitsets.
+
+        Args:
+            interests: Interests of the user
+            candidates: Interests of the candidates
+            method: Similarity measure
+
+        Returns:
+            Score of every candidate, from 0 to 1
+        """
+        index = (await UserInterestService.get_catalogue()).index
+        candidate_bitsets = index.encode([candidate.interests for candidate in candidates])
+        query_bitset = index.encode([interests])[0]
+        if method == MatchMethod.CATEGORY:
+            return index.category_weighted(candidate_bitsets, query_bitset)
+        return index.jaccard(candidate_bitsets, query_bitset)
+
+    @staticmethod
+    async def recommend_users(
+        current_user: User,
+        filter_params: UserRecommendationFilter,
+    ) -> list[UserRecommendation]:
+        """Recommend active users ranked by interest similarity with the current user.
+
+        Candidates sharing at least one interest are pre-filtered in MongoDB, up to
+        `USER_RECOMMENDATIONS_CANDIDATE_LIMIT`. Their interests are mapped to the
+        catalogue IDs and scored at once as bitsets, and only the best ones are
+        fetched as profiles. Both reads use `MONGO_SEARCH_READ_PREFERENCE`.
+
+        Args:
+            current_user: User to recommend to
+            filter_params: Candidate filter criteria and similarity measure
+
+        Returns:
+            Recommended users, best match first
+        """
+        if not current_user.interests:
+            return []
+
+        query = UserService.build_candidate_query(current_user, filter_params, interests=current_user.interests)
+        cursor = search_collection(User).find(
+            query,
+            UserInterests.Settings.projection,
+            limit=settings.USER_RECOMMENDATIONS_CANDIDATE_LIMIT,
+        )
+        candidates = [UserInterests.model_validate(candidate) async for candidate in cursor]
+        if not candidates:
+            return []
+
+        scores = await UserService.score_candidates(current_user.interests, candidates, filter_params.method)
+        limit = min(filter_params.limit, len(candidates))
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        best = best[scores[best] > 0]
+        best_ids = [candidates[i].id for i in best]
+
+        cursor = search_collection(User).find({"_id": {"$in": best_ids}}, UserRead.Settings.projection)
+        users = [UserRead.model_validate(user) async for user in cursor]
+        users_by_id = {user.id: user for user in users}
+        return [
+            UserRecommendation(user=users_by_id[candidates[i].id], score=float(scores[i]))
+            for i in best
+            if candidates[i].id in users_by_id
+        ]
+
+    @staticmethod
+    async def _add_photo(current_user: User, data: bytes) -> User:
+        """Store the resized copies of a picture and add them to the user's photos."""
+        derivatives = await ImageService.create_derivatives(data)
+
+        photo_id = uuid.uuid4().hex
+        image_format = settings.PROFILE_PICTURE_FORMAT
+        keys = [f"{current_user.id}_{photo_id}_{derivative.size}.{image_format}" for derivative in derivatives]
+        await asyncio.gather(
+            *(
+                StorageService.upload_fileobj(BytesIO(derivative.content), key, f"image/{image_format}")
+                for derivative, key in zip(derivatives, keys, strict=True)
+            ),
+        )
+        photo = Photo(
+            id=photo_id,
+            derivatives=[
+                PhotoDerivative(
+                    size=derivative.size,
+                    width=derivative.width,
+                    height=derivative.height,
+                    url=StorageService.object_url(key),
+                )
+                for derivative, key in zip(derivatives, keys, strict=True)
+            ],
+        )
+
+        # Photos are pushed rather than set from `current_user`, which can be stale if other pictures
+        # were added while this one was resized. Clients that only read `photo_urls` get the largest copy
+        updated_user = await User.find_one(User.id == current_user.id).update(
+            {
+                "$push": {"photos": photo.model_dump(), "photo_urls": photo.derivatives[-1].url},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+            },
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+        if updated_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+        current_user = updated_user
+        await UserCache.set_user(current_user)
+        await ProfileCache.invalidate(str(current_user.id))
+        return current_user
 
     @staticmethod
     async def upload_profile_picture(current_user: User, file: UploadFile) -> User:
-        """Upload a profile picture to AWS S3 and update the user's photo_urls."""
-        if not file.filename or not file.filename.endswith((".jpg", ".jpeg", ".png")):
+        """Upload a profile picture and add its resized copies to the user's photos.
+
+        The type of the file is detected from its content, not its name. The
+        picture is resized in the image worker pool and only the copies, without
+        metadata, are uploaded to AWS S3.
+
+        Args:
+            current_user: User to upload the picture for
+            file: Uploaded picture
+
+        Returns:
+            Updated user
+
+        Raises:
+            HTTPException (400): If the file is not a JPEG, PNG or WebP image
+            HTTPException (413): If the file is too large
+            HTTPException (404): If the user was deleted meanwhile
+            HTTPException (503): If the image or S3 worker pool queue is full
+        """
+        if file.size is not None and file.size > settings.PROFILE_PICTURE_MAX_SIZE_MB * MB:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File must not be larger than {settings.PROFILE_PICTURE_MAX_SIZE_MB} MB",
+            )
+        if sniff_image_type(await file.read(12)) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File must be a JPEG, PNG or WebP image",
+            )
+        await file.seek(0)
+        return await UserService._add_photo(current_user, await file.read())
+
+    @staticmethod
+    def create_picture_upload(current_user: User, upload_request: PictureUploadRequest) -> PictureUploadResponse:
+        """Create a presigned POST for uploading a profile picture directly to AWS S3.
+
+        Args:
+            current_user: User to upload the picture for
+            upload_request: Type of the picture
+
+        Returns:
+            Upload URL, form fields and the key to confirm after uploading
+        """
+        extension = PICTURE_EXTENSIONS[upload_request.content_type]
+        key = f"{_upload_key_prefix(current_user.id)}{uuid.uuid4()}.{extension}"
+        presigned_post = StorageService.create_presigned_post(
+            key,
+            upload_request.content_type,
+            settings.PROFILE_PICTURE_MAX_SIZE_MB * MB,
+        )
+        return PictureUploadResponse(
+            url=presigned_post["url"],
+            fields=presigned_post["fields"],
+            key=key,
+            expires_in=settings.AWS_S3_PRESIGNED_EXPIRE_SECONDS,
+        )
+
+    @staticmethod
+    async def confirm_picture_upload(current_user: User, upload_confirm: PictureUploadConfirm) -> User:
+        """Add the resized copies of a picture uploaded with a presigned POST to the user's photos.
+
+        The uploaded original is deleted once it is processed or turns out not
+        to be a valid image. It is kept if processing fails otherwise, so the
+        upload can be confirmed again.
+
+        Args:
+            current_user: User who uploaded the picture
+            upload_confirm: Key of the uploaded picture
+
+        Returns:
+            Updated user
+
+        Raises:
+            HTTPException (400): If the key is invalid, nothing was uploaded or it is not an image
+            HTTPException (404): If the user was deleted meanwhile
+            HTTPException (503): If the image or S3 worker pool queue is full
+        """
+        key = upload_confirm.key
+        if not key.startswith(_upload_key_prefix(current_user.id)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid picture key",
+            )
+        metadata = await StorageService.head_object(key)
+        if metadata is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File must have a valid filename and extension",
+                detail="Picture was not uploaded",
             )
-        unique_filename = f"{current_user.id}_{uuid.uuid4()}.{file.filename.split('.')[-1]}"
-        file.file.seek(0)
-        s3_client.upload_fileobj(file.file, settings.AWS_S3_BUCKET, unique_filename)
-        file_url = f"{settings.AWS_S3_ENDPOINT_URL}/{settings.AWS_S3_BUCKET}/{unique_filename}"
-        current_user.photo_urls.append(file_url)
-        await current_user.update({"$set": {"photo_urls": current_user.photo_urls}})
+        try:
+            current_user = await UserService._add_photo(current_user, await StorageService.download(key))
+        except HTTPException as e:
+            if e.status_code == status.HTTP_400_BAD_REQUEST:
+                await StorageService.delete_object(key)
+            raise
+        await StorageService.delete_object(key)
         return current_user
@@ -1,18 +1,41 @@
-from fastapi import APIRouter
+from typing import Annotated
+
+from fastapi import APIRouter, Header
+
+from app.core.utils.etag import json_response
 
 from .schemas import UserInterestsResponse
-from .service import UserInterestService
+from .service import SerializedJSON, UserInterestService
 
 router = APIRouter(prefix="/user-interests", tags=["User Interests"])
 
+EMPTY_LIST = SerializedJSON.dump([])
+
 
 @router.get("/", response_model=UserInterestsResponse)
-async def get_all_user_interests():
-    """Get all user interests."""
-    return await UserInterestService.get_all_user_interests()
+async def get_all_user_interests(
+    if_none_match: Annotated[str | None, Header()] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
+):
+    """Get all user interests.
+
+    Returns status code 304 if `If-None-Match` matches the current ETag.
+    """
+    catalogue = await UserInterestService.get_catalogue()
+    serialized = catalogue.all
+    return json_response(serialized.content, serialized.etag, if_none_match, serialized.gzipped, accept_encoding)
 
 
 @router.get("/{category}", response_model=list[str])
-async def get_user_interests(category: str):
-    """Get user interests by category."""
-    return await UserInterestService.get_user_interests(category)
+async def get_user_interests(
+    category: str,
+    if_none_match: Annotated[str | None, Header()] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
+):
+    """Get user interests by category.
+
+    Returns status code 304 if `If-None-Match` matches the current ETag.
+    """
+    catalogue = await UserInterestService.get_catalogue()
+    serialized = catalogue.by_category.get(category, EMPTY_LIST)
+    return json_response(serialized.content, serialized.etag, if_none_match, serialized.gzipped, accept_encoding)
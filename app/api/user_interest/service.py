@@ -1,31 +1,114 @@
+import asyncio
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from app.config import settings
 from app.core.models import UserInterest
+from app.core.services.redis_service import RedisService
+from app.core.utils.etag import make_etag
+from app.core.utils.interest_bitset import InterestIndex
 
 from .schemas import UserInterestsResponse
 
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "user_interests:version"
+
+
+@dataclass(frozen=True)
+class SerializedJSON:
+    """JSON content serialized once together with its ETag, and compressed once if it is large."""
+
+    content: bytes
+    etag: str
+    gzipped: bytes | None = None
+
+    @classmethod
+    def dump(cls, data: object) -> "SerializedJSON":
+        """Serialize data to JSON."""
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        gzipped = None
+        if len(content) >= settings.GZIP_MINIMUM_SIZE:
+            gzipped = gzip.compress(content, compresslevel=settings.GZIP_COMPRESS_LEVEL, mtime=0)
+        return cls(content=content, etag=make_etag(content), gzipped=gzipped)
+
+
+@dataclass(frozen=True)
+class InterestCatalogue:
+    """Snapshot of all user interests."""
+
+    version: str | None
+    interests: dict[str, list[str]]
+    all: SerializedJSON
+    by_category: dict[str, SerializedJSON]
+    index: InterestIndex
+
 
 class UserInterestService:
-    """Service for user interests."""
+    """Service for user interests.
 
-    @staticmethod
-    async def get_all_user_interests() -> UserInterestsResponse:
-        """Get all user interests.
+    The catalogue only changes when the importer runs, so each worker keeps a
+    snapshot of it in memory, together with the serialized responses. The
+    importer bumps a version key in Redis, which is checked at most every
+    `USER_INTERESTS_VERSION_CHECK_SECONDS`.
+    """
 
-        Returns:
-            List of user interests in a dictionary format.
-        """
-        interests = {}
-        async for interest in UserInterest.find_all():
-            if interest.category not in interests:
-                interests[interest.category] = []
-            interests[interest.category].append(interest.name)
+    _catalogue: InterestCatalogue | None = None
+    _checked_at: float = 0.0
+    _lock = asyncio.Lock()
 
-        return UserInterestsResponse(interests=interests)
+    @staticmethod
+    async def _get_version() -> str | None:
+        return await RedisService.client().get(VERSION_KEY)
 
     @staticmethod
-    async def get_user_interests(category: str) -> list[str]:
-        """Get user interests by category.
+    async def _build(version: str | None) -> InterestCatalogue:
+        interests: dict[str, list[str]] = {}
+        async for interest in UserInterest.find_all().sort("_id"):
+            interests.setdefault(interest.category, []).append(interest.name)
+
+        return InterestCatalogue(
+            version=version,
+            interests=interests,
+            all=SerializedJSON.dump(UserInterestsResponse(interests=interests).model_dump()),
+            by_category={category: SerializedJSON.dump(names) for category, names in interests.items()},
+            index=InterestIndex(interests),
+        )
+
+    @classmethod
+    def _should_check_version(cls) -> bool:
+        return time.monotonic() - cls._checked_at >= settings.USER_INTERESTS_VERSION_CHECK_SECONDS
+
+    @classmethod
+    async def get_catalogue(cls) -> InterestCatalogue:
+        """Get the current snapshot of the catalogue, rebuilding it if the version changed.
 
         Returns:
-            List of user interests.
+            Catalogue snapshot
         """
-        return [interest.name async for interest in UserInterest.find(UserInterest.category == category)]
+        if cls._catalogue is not None and not cls._should_check_version():
+            return cls._catalogue
+
+        async with cls._lock:
+            if cls._catalogue is not None and not cls._should_check_version():
+                return cls._catalogue
+            try:
+                version = await cls._get_version()
+            except RedisError:
+                logger.exception("Failed to check user interests version")
+                version = cls._catalogue.version if cls._catalogue is not None else None
+            if cls._catalogue is None or cls._catalogue.version != version:
+                cls._catalogue = await cls._build(version)
+                logger.info("User interests catalogue built, version %s", version)
+            cls._checked_at = time.monotonic()
+            return cls._catalogue
+
+    @staticmethod
+    async def bump_version():
+        """Mark the catalogue as changed, so every worker rebuilds its snapshot."""
+        await RedisService.client().incr(VERSION_KEY)
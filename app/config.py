@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,12 +13,32 @@ class Settings(BaseSettings):
     MONGO_PORT: int = 27017
     MONGO_DB: str = "MeetingApp"
     MONGO_TIMEOUT: int = 5000
+    # Indexes are created by app/core/scripts/migrate.py, the app only checks them by default
+    MONGO_INDEX_MODE: Literal["create", "verify", "skip"] = "verify"
+
+    # MongoDB connection pool settings
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_POOL_SIZE: int = 100
+    # Replaces the single operation timeout with per phase timeouts if set
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int | None = None
+    MONGO_COMPRESSORS: list[Literal["zstd", "snappy", "zlib"]] = ["zstd", "zlib"]
+    # Searches may read from secondaries lagging at most MONGO_MAX_STALENESS_SECONDS, 90 at least
+    MONGO_SEARCH_READ_PREFERENCE: Literal[
+        "primary",
+        "primaryPreferred",
+        "secondary",
+        "secondaryPreferred",
+        "nearest",
+    ] = "primary"
+    MONGO_MAX_STALENESS_SECONDS: int = 90
 
     # JWT settings
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Revoked tokens reach the local denylist of every worker within this time
+    AUTH_DENYLIST_SYNC_SECONDS: float = 5
 
     # AWS S3 settings
     AWS_S3_BUCKET: str = "meetingapp-profile-pictures"
@@ -24,9 +46,78 @@ class Settings(BaseSettings):
     AWS_S3_ENDPOINT_URL: str = "http://185.157.214.169:4566"
     AWS_S3_ACCESS_KEY_ID: str
     AWS_S3_SECRET_ACCESS_KEY: str
+    AWS_S3_WORKERS: int = 8
+    AWS_S3_MAX_PENDING: int = 32
+    AWS_S3_MULTIPART_THRESHOLD_MB: int = 8
+    AWS_S3_MULTIPART_CHUNK_MB: int = 8
+    AWS_S3_MULTIPART_CONCURRENCY: int = 4
+    AWS_S3_PRESIGNED_EXPIRE_SECONDS: int = 300
+
+    # Profile picture settings
+    PROFILE_PICTURE_MAX_SIZE_MB: int = 10
+    PROFILE_PICTURE_SIZES: list[int] = [128, 512, 1080]
+    PROFILE_PICTURE_FORMAT: Literal["webp", "jpeg"] = "webp"
+    PROFILE_PICTURE_QUALITY: int = 85
+
+    # Image processing settings
+    IMAGE_WORKERS: int = 2
+    IMAGE_MAX_PENDING: int = 16
+
+    # Redis settings
+    REDIS_HOST: str = "redis"
+    REDIS_PORT: int = 6379
+    REDIS_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_TIMEOUT: float = 5.0
+
+    # User cache settings
+    USER_CACHE_LOCAL_MAX_SIZE: int = 10000
+    USER_CACHE_LOCAL_TTL_SECONDS: float = 30
+    USER_CACHE_REDIS_TTL_SECONDS: int = 300
+
+    # Profile cache settings, bounds how long a profile read during an update can stay stale
+    PROFILE_CACHE_TTL_SECONDS: int = 300
+
+    # Maximum number of profiles fetched at once by GET /users/batch
+    USER_BATCH_MAX_IDS: int = 100
+
+    # Discovery feed settings, a refill ranks every candidate, read in batches of FEED_REFILL_BATCH,
+    # fills the queue up to FEED_QUEUE_TARGET and starts in the background once fewer than
+    # FEED_LOW_WATER are queued. A feed without more candidates is not ranked again for
+    # FEED_EXHAUSTED_TTL_SECONDS
+    FEED_REFILL_BATCH: int = 500
+    FEED_QUEUE_TARGET: int = 200
+    FEED_LOW_WATER: int = 50
+    FEED_REFILL_QUEUE_SIZE: int = 1000
+    FEED_REFILL_LOCK_SECONDS: int = 30
+    FEED_REFILL_WAIT_SECONDS: float = 5
+    FEED_EXHAUSTED_TTL_SECONDS: int = 600
+    FEED_TTL_SECONDS: int = 86400
+    FEED_SEEN_TTL_SECONDS: int = 30 * 86400
+
+    # User interests settings
+    USER_INTERESTS_VERSION_CHECK_SECONDS: float = 30
+
+    # User recommendations settings
+    USER_RECOMMENDATIONS_CANDIDATE_LIMIT: int = 5000
 
     PASSWORD_PATTERN: str = r"^(?=.*[a-zA-Z])(?=.*\d).+$"
 
+    # Password hashing settings
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Response compression settings
+    GZIP_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESS_LEVEL: int = 6
+
+    # Monitoring settings
+    METRICS_ENABLED: bool = True
+    SLOW_COMMAND_LOG_ENABLED: bool = True
+    SLOW_COMMAND_THRESHOLD_MS: float = 100
+    SLOW_COMMAND_EXPLAIN: bool = True
+
     @property
     def MONGO_URI(self) -> str:
         """Construct MongoDB URI from credentials."""
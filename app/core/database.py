@@ -1,21 +1,188 @@
+import asyncio
 import logging
+from typing import Any, Literal
 
-from beanie import init_beanie
-from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import Document, init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo.read_preferences import ReadPreference, make_read_preference, read_pref_mode_from_name
 
 from app.config import settings
+from app.core.monitoring.mongodb import CommandTimer, PoolMonitor
+from app.core.monitoring.slow_commands import SlowCommandRecorder
 
 from .models import MODELS
 
 logger = logging.getLogger(__name__)
 
+_search_mode = read_pref_mode_from_name(settings.MONGO_SEARCH_READ_PREFERENCE)
+# Staleness can only be bounded when secondaries may be read
+SEARCH_READ_PREFERENCE = make_read_preference(
+    _search_mode,
+    None,
+    -1 if _search_mode == ReadPreference.PRIMARY.mode else settings.MONGO_MAX_STALENESS_SECONDS,
+)
+
+
+def _timeouts() -> dict[str, int]:
+    """Get the timeout options of the client.
+
+    pymongo ignores `waitQueueTimeoutMS` when `timeoutMS` is set, so a pool wait
+    timeout replaces the single timeout with one per phase of an operation.
+    """
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is None:
+        return {"connectTimeoutMS": settings.MONGO_TIMEOUT, "timeoutMS": settings.MONGO_TIMEOUT}
+    return {
+        "connectTimeoutMS": settings.MONGO_TIMEOUT,
+        "serverSelectionTimeoutMS": settings.MONGO_TIMEOUT,
+        "socketTimeoutMS": settings.MONGO_TIMEOUT,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    }
+
+
+IndexMode = Literal["create", "verify", "skip"]
+
+
+# Options that change what an index guarantees or which queries can use it
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "collation")
+
+
+def _same_index(declared: dict[str, Any], existing: dict[str, Any]) -> bool:
+    """Compare a declared index with an existing one by keys and options.
+
+    Options the server adds, such as the 2dsphere index version or the collation
+    settings left to their defaults, do not count as differences.
+    """
+    if list(existing["key"]) != list(declared["key"].items()):
+        return False
+    for option in INDEX_OPTIONS:
+        wanted, actual = declared.get(option), existing.get(option)
+        if option in ("unique", "sparse"):
+            if bool(wanted) != bool(actual):
+                return False
+        elif option == "collation":
+            if (wanted is None) != (actual is None):
+                return False
+            if wanted is not None and any(actual.get(key) != value for key, value in wanted.items()):
+                return False
+        elif wanted != actual:
+            return False
+    return True
+
+
+async def compare_indexes(model: type[Document]) -> tuple[list[str], list[str]]:
+    """Find the indexes declared in the settings of a model that the collection does not have as declared.
+
+    Indexes are compared by name, keys and the options in `INDEX_OPTIONS`.
+
+    Args:
+        model: Document model
+
+    Returns:
+        Names of the missing indexes and of the indexes that exist with other keys or options
+    """
+    existing = await model.get_motor_collection().index_information()
+    missing, outdated = [], []
+    for index in model.get_settings().indexes:
+        if index.name not in existing:
+            missing.append(index.name)
+        elif not _same_index(index.document, existing[index.name]):
+            outdated.append(index.name)
+    return missing, outdated
+
+
+async def verify_indexes():
+    """Check that every collection has its declared indexes, with the declared keys and options.
+
+    Raises:
+        RuntimeError: If any index is missing or has to be rebuilt
+    """
+    results = await asyncio.gather(*(compare_indexes(model) for model in MODELS))
+    missing, outdated = [], []
+    for model, (model_missing, model_outdated) in zip(MODELS, results, strict=True):
+        collection = model.get_motor_collection().name
+        missing += [f"{collection}.{name}" for name in model_missing]
+        outdated += [f"{collection}.{name}" for name in model_outdated]
+    problems = []
+    if missing:
+        problems.append(f"Missing indexes: {', '.join(missing)}")
+    if outdated:
+        problems.append(f"Indexes to rebuild with other keys or options: {', '.join(outdated)}")
+    if problems:
+        raise RuntimeError(f"{'. '.join(problems)}. Fix them with `python app/core/scripts/migrate.py`")
+
+
+async def create_indexes() -> list[str]:
+    """Create the indexes declared in the settings of every model that their collections do not have as declared.
+
+    Indexes with other keys or options are dropped and built again, so the
+    queries they back can't use them until the new ones are built.
+
+    Returns:
+        Names of the created indexes
+    """
+    created = []
+    for model in MODELS:
+        collection = model.get_motor_collection()
+        missing, outdated = await compare_indexes(model)
+        for name in outdated:
+            await collection.drop_index(name)
+        build = set(missing) | set(outdated)
+        if build:
+            indexes = [index.index for index in model.get_settings().indexes if index.name in build]
+            await collection.create_indexes(indexes)
+            created += [f"{collection.name}.{name}" for name in sorted(build)]
+    return created
+
+
+async def initialize_database(index_mode: IndexMode | None = None) -> AsyncIOMotorClient:
+    """Initialize the database.
+
+    Args:
+        index_mode: Whether to create the indexes of the models, only check that
+            they exist or skip them. `MONGO_INDEX_MODE` by default
+
+    Returns:
+        Client of the database, to be closed when the app stops
+
+    Raises:
+        RuntimeError: If indexes are verified and any is missing
+    """
+    index_mode = index_mode or settings.MONGO_INDEX_MODE
+    listeners = []
+    if settings.METRICS_ENABLED:
+        listeners += [CommandTimer(), PoolMonitor()]
+    slow_commands = None
+    if settings.SLOW_COMMAND_LOG_ENABLED:
+        slow_commands = SlowCommandRecorder(settings.SLOW_COMMAND_THRESHOLD_MS, explain=settings.SLOW_COMMAND_EXPLAIN)
+        listeners.append(slow_commands)
 
-async def initialize_database():
-    """Initialize the database."""
     client = AsyncIOMotorClient(
         settings.MONGO_URI,
-        connectTimeoutMS=settings.MONGO_TIMEOUT,
-        timeoutMS=settings.MONGO_TIMEOUT,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        compressors=settings.MONGO_COMPRESSORS,
+        event_listeners=listeners,
+        **_timeouts(),
     )
-    await init_beanie(client[settings.MONGO_DB], document_models=MODELS)
-    logger.info("Database initialized")
+    if slow_commands is not None:
+        slow_commands.attach(client)
+    await init_beanie(client[settings.MONGO_DB], document_models=MODELS, skip_indexes=index_mode != "create")
+    if index_mode == "verify":
+        await verify_indexes()
+    logger.info("Database initialized, indexes: %s", index_mode)
+    return client
+
+
+def search_collection(model: type[Document]) -> AsyncIOMotorCollection:
+    """Get the collection of a model for read-heavy searches that tolerate slightly stale results.
+
+    Beanie queries always read from the client's read preference, so searches
+    use the collection with `MONGO_SEARCH_READ_PREFERENCE` directly.
+
+    Args:
+        model: Document model
+
+    Returns:
+        Collection reading with the search read preference
+    """
+    return model.get_motor_collection().with_options(read_preference=SEARCH_READ_PREFERENCE)
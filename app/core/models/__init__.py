@@ -1,4 +1,6 @@
+from .event import Event
+from .event_participant import EventParticipant
 from .user import User
 from .user_interest import UserInterest
 
-MODELS = [User, UserInterest]
+MODELS = [User, UserInterest, Event, EventParticipant]
@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
+import pymongo
 from beanie import Document, PydanticObjectId
-from pydantic import Field
+from pydantic import Field, field_validator
 
-from .location import Location
+from .location import GeoPoint
 
 
 class Event(Document):
@@ -13,26 +14,39 @@ class Event(Document):
     title: str
     description: str
     category: str
-    location: Location
+    location: GeoPoint
     start_date: datetime
     end_date: datetime
     max_participants: int
+    participants_count: int = 0
     verified: bool = False
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    @field_validator("location", mode="before")
+    @classmethod
+    def convert_legacy_location(cls, v):
+        """Accept documents that still store location as `{latitude, longitude}`."""
+        return GeoPoint.from_legacy(v)
+
     class Settings:
         """Settings for the Event model."""
 
         name = "events"
+        # One index backs the discovery query of `EventService.search_events`: $geoNear
+        # on `location`, with `category` equality and the time window bounds checked on
+        # index keys. Search only returns active, verified events, so it is partial.
+        # `app/core/scripts/index_advisor.py` checks the plans.
         indexes = [
-            "category",
-            "location.longitude",
-            "location.latitude",
-            "start_date",
-            "end_date",
-            "max_participants",
-            "verified",
-            "is_active",
+            pymongo.IndexModel(
+                [
+                    ("location", pymongo.GEOSPHERE),
+                    ("category", pymongo.ASCENDING),
+                    ("start_date", pymongo.ASCENDING),
+                    ("end_date", pymongo.ASCENDING),
+                ],
+                name="search_location_category_start_end",
+                partialFilterExpression={"is_active": True, "verified": True},
+            ),
         ]
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+import pymongo
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+
+
+class EventParticipant(Document):
+    """Participation of a user in an event."""
+
+    event_id: PydanticObjectId
+    user_id: PydanticObjectId
+    joined_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Whether `participants_count` of the event includes this participation,
+    # records written before the flag existed are counted
+    counted: bool = True
+
+    class Settings:
+        """Settings for the EventParticipant model."""
+
+        name = "event_participants"
+        indexes = [
+            pymongo.IndexModel(
+                [("event_id", pymongo.ASCENDING), ("user_id", pymongo.ASCENDING)],
+                name="event_user",
+                unique=True,
+            ),
+        ]
@@ -1,8 +1,44 @@
-from pydantic import BaseModel
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
 
 
 class Location(BaseModel):
     """Location model."""
 
-    latitude: float
-    longitude: float
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+    @classmethod
+    def from_geojson(cls, value: Any) -> Any:
+        """Convert a GeoJSON point to a location, other values are returned as is."""
+        if isinstance(value, GeoPoint):
+            return value.to_location()
+        if isinstance(value, dict) and "coordinates" in value:
+            longitude, latitude = value["coordinates"]
+            return cls(latitude=latitude, longitude=longitude)
+        return value
+
+
+class GeoPoint(BaseModel):
+    """GeoJSON point, stored in MongoDB for 2dsphere queries."""
+
+    type: Literal["Point"] = "Point"
+    coordinates: tuple[float, float]  # (longitude, latitude)
+
+    @classmethod
+    def from_location(cls, location: Location) -> "GeoPoint":
+        """Create a point from a location."""
+        return cls(coordinates=(location.longitude, location.latitude))
+
+    @classmethod
+    def from_legacy(cls, value: Any) -> Any:
+        """Convert a legacy `{latitude, longitude}` document, other values are returned as is."""
+        if isinstance(value, dict) and "latitude" in value and "longitude" in value:
+            return cls(coordinates=(value["longitude"], value["latitude"]))
+        return value
+
+    def to_location(self) -> Location:
+        """Convert the point to a location."""
+        longitude, latitude = self.coordinates
+        return Location(latitude=latitude, longitude=longitude)
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from pydantic import BaseModel, Field
+
+
+class PhotoDerivative(BaseModel):
+    """Resized copy of a photo."""
+
+    size: int
+    width: int
+    height: int
+    url: str
+
+
+class Photo(BaseModel):
+    """Profile photo stored as resized copies, smallest first."""
+
+    id: str
+    derivatives: list[PhotoDerivative]
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -2,13 +2,20 @@ from datetime import date, datetime, timezone
 from enum import Enum
 from typing import Annotated
 
+import pymongo
 from beanie import Document
-from pydantic import Field
+from pydantic import Field, field_validator
 from pydantic_extra_types.phone_numbers import PhoneNumber, PhoneNumberValidator
+from pymongo.collation import Collation, CollationStrength
 
 from app.core.utils.age import get_age
 
-from .location import Location
+from .location import GeoPoint
+from .photo import Photo
+
+# Usernames and emails are unique regardless of case. Queries by them pass this
+# collation, or they can't use the unique indexes
+CASE_INSENSITIVE = Collation(locale="en", strength=CollationStrength.SECONDARY)
 
 # Currently not used, but let it be here for future use
 PhoneNumberType = Annotated[
@@ -35,13 +42,20 @@ class User(Document):
     gender: Gender | None = None
     bio: str | None = None
     interests: list[str] = Field(default_factory=list)
-    location: Location | None = None
+    location: GeoPoint | None = None
     photo_urls: list[str] = Field(default_factory=list)
+    photos: list[Photo] = Field(default_factory=list)
     verified: bool = False
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    @field_validator("location", mode="before")
+    @classmethod
+    def convert_legacy_location(cls, v):
+        """Accept documents that still store location as `{latitude, longitude}`."""
+        return GeoPoint.from_legacy(v)
+
     @property
     def age(self) -> int | None:
         """Calculate age based on birth date."""
@@ -53,13 +67,48 @@ class User(Document):
         """Settings for the User model."""
 
         name = "users"
+        # Search indexes follow the equality, sort, range rule for the query shapes of
+        # `UserService.build_search_query`: equality filters first, then `_id` that
+        # pages are sorted by, then the `birth_date` range. Search only returns active
+        # users, so they are partial on `is_active`.
+        # `app/core/scripts/index_advisor.py` checks the plans.
+        # Uniqueness of usernames and emails is enforced by their indexes alone, so
+        # writes don't need a check beforehand that concurrent writes could race past.
         indexes = [
-            "username",
-            "email",
-            "birth_date",
-            "gender",
-            "location.longitude",
-            "location.latitude",
-            "verified",
-            "is_active",
+            pymongo.IndexModel("username", name="username_unique", unique=True, collation=CASE_INSENSITIVE),
+            pymongo.IndexModel("email", name="email_unique", unique=True, collation=CASE_INSENSITIVE),
+            pymongo.IndexModel(
+                [("_id", pymongo.ASCENDING), ("birth_date", pymongo.ASCENDING)],
+                name="search_id_birth_date",
+                partialFilterExpression={"is_active": True},
+            ),
+            pymongo.IndexModel(
+                [("gender", pymongo.ASCENDING), ("_id", pymongo.ASCENDING), ("birth_date", pymongo.ASCENDING)],
+                name="search_gender_id_birth_date",
+                partialFilterExpression={"is_active": True},
+            ),
+            pymongo.IndexModel(
+                [
+                    ("verified", pymongo.ASCENDING),
+                    ("gender", pymongo.ASCENDING),
+                    ("_id", pymongo.ASCENDING),
+                    ("birth_date", pymongo.ASCENDING),
+                ],
+                name="search_verified_gender_id_birth_date",
+                partialFilterExpression={"is_active": True},
+            ),
+            pymongo.IndexModel(
+                [("interests", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+                name="search_interests_id",
+                partialFilterExpression={"is_active": True},
+            ),
+            pymongo.IndexModel(
+                [
+                    ("location", pymongo.GEOSPHERE),
+                    ("gender", pymongo.ASCENDING),
+                    ("birth_date", pymongo.ASCENDING),
+                ],
+                name="search_location_gender_birth_date",
+                partialFilterExpression={"is_active": True},
+            ),
         ]
@@ -1,3 +1,4 @@
+import pymongo
 from beanie import Document
 
 
@@ -11,4 +12,10 @@ class UserInterest(Document):
         """Settings for the user interest model."""
 
         name = "user_interests"
-        indexes = ["category", "name"]
+        indexes = [
+            pymongo.IndexModel(
+                [("category", pymongo.ASCENDING), ("name", pymongo.ASCENDING)],
+                name="category_name",
+                unique=True,
+            ),
+        ]
@@ -0,0 +1,41 @@
+import time
+from typing import Any
+
+from botocore.client import BaseClient
+
+from .metrics import S3_REQUEST_DURATION
+
+# Keys of the botocore request context shared by the events of one API call
+START_KEY = "metrics_start"
+OPERATION_KEY = "metrics_operation"
+
+
+def _before_call(model: Any, context: dict[str, Any], **_: Any):
+    context[START_KEY] = time.perf_counter()
+    context[OPERATION_KEY] = model.name
+
+
+def _after_call(http_response: Any, context: dict[str, Any], **_: Any):
+    _observe(context, "error" if http_response.status_code >= 400 else "success")
+
+
+def _after_call_error(context: dict[str, Any], **_: Any):
+    _observe(context, "error")
+
+
+def _observe(context: dict[str, Any], outcome: str):
+    start = context.pop(START_KEY, None)
+    if start is not None:
+        S3_REQUEST_DURATION.labels(context.get(OPERATION_KEY, "unknown"), outcome).observe(time.perf_counter() - start)
+
+
+def instrument_s3_client(client: BaseClient):
+    """Record the duration of every API call of an S3 client by operation.
+
+    Args:
+        client: boto3 S3 client
+    """
+    events = client.meta.events
+    events.register("before-call.s3.*", _before_call)
+    events.register("after-call.s3.*", _after_call)
+    events.register("after-call-error.s3.*", _after_call_error)
@@ -0,0 +1,79 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Latency buckets from 1 ms to 10 s, the default ones start at 5 ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled, by method since the route is only known after routing",
+    ["method"],
+)
+MONGODB_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "Duration of MongoDB commands",
+    ["command", "collection", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+MONGODB_SLOW_COMMANDS = Counter(
+    "mongodb_slow_commands",
+    "MongoDB commands slower than the slow command threshold",
+    ["command", "collection"],
+)
+MONGODB_POOL_CHECKOUT_DURATION = Histogram(
+    "mongodb_pool_checkout_duration_seconds",
+    "Time waited for a connection from the MongoDB pool, including opening it",
+    ["address", "outcome"],
+    buckets=(0.0001, 0.0005, *LATENCY_BUCKETS),
+)
+MONGODB_POOL_CONNECTIONS = Gauge(
+    "mongodb_pool_connections",
+    "Connections of the MongoDB pool, open or checked out",
+    ["address", "state"],
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Duration of Redis commands, a pipeline counts as one command",
+    ["command", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+S3_REQUEST_DURATION = Histogram(
+    "s3_request_duration_seconds",
+    "Duration of AWS S3 API calls, including retries",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+USER_CACHE_LOOKUPS = Counter(
+    "user_cache_lookups",
+    "User cache lookups by the tier that served them, `database` for misses",
+    ["tier"],
+)
+USER_CACHE_LOCAL_SIZE = Gauge(
+    "user_cache_local_size",
+    "Users in the in-process tier of the user cache",
+)
+PASSWORD_OPERATION_DURATION = Histogram(
+    "password_operation_duration_seconds",
+    "Duration of password hashes and verifications, including the wait for a worker",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_OPERATIONS_REJECTED = Counter(
+    "password_operations_rejected",
+    "Password hashes and verifications rejected because too many were pending",
+    ["operation"],
+)
+PASSWORD_OPERATIONS_PENDING = Gauge(
+    "password_operations_pending",
+    "Password hashes and verifications waiting for or running in the worker pool",
+)
+PROFILE_CACHE_LOOKUPS = Counter(
+    "profile_cache_lookups",
+    "Profile cache lookups by result, `coalesced` for misses that joined a load in progress",
+    ["result"],
+)
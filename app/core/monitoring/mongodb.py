@@ -0,0 +1,91 @@
+from pymongo import monitoring
+
+from .metrics import MONGODB_COMMAND_DURATION, MONGODB_POOL_CHECKOUT_DURATION, MONGODB_POOL_CONNECTIONS
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Records the duration of every MongoDB command by name and collection.
+
+    The collection is only known from the started event, so it is kept until
+    the command finishes. pymongo calls listeners synchronously, so this must
+    stay cheap.
+    """
+
+    def __init__(self):
+        """Create a listener with no commands in flight."""
+        self._collections: dict[tuple[object, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        """Remember the collection of a started command."""
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            # getMore names the collection separately, database commands have none
+            target = event.command.get("collection", "")
+        self._collections[(event.connection_id, event.request_id)] = target
+
+    def _observe(self, event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGODB_COMMAND_DURATION.labels(event.command_name, collection, outcome).observe(
+            event.duration_micros / 1_000_000,
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        """Record the duration of a succeeded command."""
+        self._observe(event, "success")
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        """Record the duration of a failed command."""
+        self._observe(event, "error")
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Records how long operations wait for pooled connections and how many are in use.
+
+    A pool is saturated when checked out connections reach `MONGO_MAX_POOL_SIZE`
+    and checkout waits grow.
+    """
+
+    @staticmethod
+    def _address(address: tuple[str, int]) -> str:
+        host, port = address
+        return f"{host}:{port}"
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent):
+        """Nothing to record."""
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent):
+        """Nothing to record."""
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent):
+        """Nothing to record, closed connections are recorded one by one."""
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent):
+        """Nothing to record."""
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent):
+        """Count an open connection."""
+        MONGODB_POOL_CONNECTIONS.labels(self._address(event.address), "open").inc()
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent):
+        """Nothing to record."""
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent):
+        """Stop counting a closed connection."""
+        MONGODB_POOL_CONNECTIONS.labels(self._address(event.address), "open").dec()
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent):
+        """Nothing to record, the wait is recorded when it ends."""
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent):
+        """Record the wait of a failed checkout, by the reason it failed."""
+        MONGODB_POOL_CHECKOUT_DURATION.labels(self._address(event.address), event.reason).observe(event.duration or 0)
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent):
+        """Record the wait of a checkout and count the connection as in use."""
+        address = self._address(event.address)
+        MONGODB_POOL_CHECKOUT_DURATION.labels(address, "success").observe(event.duration or 0)
+        MONGODB_POOL_CONNECTIONS.labels(address, "in_use").inc()
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent):
+        """Stop counting a connection as in use."""
+        MONGODB_POOL_CONNECTIONS.labels(self._address(event.address), "in_use").dec()
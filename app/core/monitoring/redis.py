@@ -0,0 +1,41 @@
+import time
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from .metrics import REDIS_COMMAND_DURATION
+
+
+class TimedPipeline(Pipeline):
+    """Pipeline that records the duration of its execution."""
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        """Execute the queued commands and record the duration as one `PIPELINE` command."""
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            result = await super().execute(raise_on_error)
+            outcome = "success"
+            return result
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE", outcome).observe(time.perf_counter() - start)
+
+
+class TimedRedis(Redis):
+    """Redis client that records the duration of every command."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        """Execute a command and record its duration by name."""
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            result = await super().execute_command(*args, **options)
+            outcome = "success"
+            return result
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).upper(), outcome).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TimedPipeline:
+        """Create a pipeline that records the duration of its execution."""
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+from collections.abc import Mapping
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+from app.core.utils.explain import summarize_explain
+
+from .metrics import MONGODB_SLOW_COMMANDS
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE_COMMANDS = frozenset({"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"})
+# Fields the driver adds to commands, explain rejects some of them
+DRIVER_FIELDS = frozenset(
+    {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "readConcern", "writeConcern", "apiVersion"},
+)
+# Fields that do not change the plan a command gets
+SHAPE_IGNORED_FIELDS = DRIVER_FIELDS | {"projection", "limit", "skip", "batchSize", "singleBatch", "cursor"}
+# Fields kept as they are in shapes, they decide which index fits
+SHAPE_KEPT_FIELDS = frozenset({"sort", "$sort"})
+# Logged shapes are forgotten past this, so a shape is logged again at most once per this many shapes
+MAX_SHAPES = 10_000
+
+
+def normalize_shape(value: Any) -> Any:
+    """Replace literals in a filter or a pipeline with `?`, keeping field names and operators.
+
+    Lists of documents such as `$or` and pipelines keep their documents, other
+    lists such as `$in` values become a single `?`.
+    """
+    if isinstance(value, Mapping):
+        return {k: v if k in SHAPE_KEPT_FIELDS else normalize_shape(v) for k, v in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, Mapping) for item in value):
+        return [normalize_shape(item) for item in value]
+    return "?"
+
+
+def command_shape(command_name: str, command: Mapping) -> str:
+    """Get the query shape of a command, the same for every command that differs only in values."""
+    fields = {k: v for k, v in command.items() if k != command_name and k not in SHAPE_IGNORED_FIELDS}
+    shape = {command_name: command.get(command_name), **normalize_shape(fields)}
+    return json.dumps(shape, ensure_ascii=False, default=str)
+
+
+class SlowCommandRecorder(monitoring.CommandListener):
+    """Logs MongoDB commands slower than a threshold once per query shape, with a summary of their explain.
+
+    pymongo calls listeners from the threads of Motor, so slow commands are
+    handed to the event loop, where shapes are deduplicated and explained.
+    """
+
+    def __init__(self, threshold_ms: float, explain: bool):
+        """Create a recorder.
+
+        Args:
+            threshold_ms: Commands that take at least this long are slow
+            explain: Whether to explain slow commands
+        """
+        self.threshold_micros = threshold_ms * 1000
+        self.explain = explain
+        self._commands: dict[tuple[object, int], tuple[str, Mapping]] = {}
+        self._seen: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._client: AsyncIOMotorClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def attach(self, client: AsyncIOMotorClient):
+        """Explain slow commands with a client, on the running event loop."""
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        """Remember a command that can be explained until it finishes."""
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            self._commands[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def _finish(self, event: monitoring.CommandSucceededEvent | monitoring.CommandFailedEvent):
+        started = self._commands.pop((event.connection_id, event.request_id), None)
+        if started is None or event.duration_micros < self.threshold_micros or self._loop is None:
+            return
+        database, command = started
+        self._loop.call_soon_threadsafe(self._record, event.command_name, database, command, event.duration_micros)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        """Record a command if it was slow."""
+        self._finish(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        """Record a command if it was slow, timeouts are the slowest ones."""
+        self._finish(event)
+
+    def _record(self, command_name: str, database: str, command: Mapping, duration_micros: int):
+        collection = str(command.get(command_name))
+        MONGODB_SLOW_COMMANDS.labels(command_name, collection).inc()
+
+        shape = command_shape(command_name, command)
+        if shape in self._seen:
+            return
+        if len(self._seen) >= MAX_SHAPES:
+            self._seen.clear()
+        self._seen.add(shape)
+
+        duration_ms = duration_micros / 1000
+        if not self.explain or self._client is None:
+            logger.warning("Slow MongoDB %s on %s took %.0f ms: %s", command_name, collection, duration_ms, shape)
+            return
+        task = asyncio.create_task(self._explain_and_log(command_name, database, command, duration_ms, shape))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain_and_log(
+        self,
+        command_name: str,
+        database: str,
+        command: Mapping,
+        duration_ms: float,
+        shape: str,
+    ):
+        collection = command.get(command_name)
+        try:
+            explain = await self._client[database].command(
+                "explain",
+                {k: v for k, v in command.items() if k not in DRIVER_FIELDS},
+                verbosity="executionStats",
+            )
+        except PyMongoError as e:
+            logger.warning(
+                "Slow MongoDB %s on %s took %.0f ms, explain failed (%s): %s",
+                command_name,
+                collection,
+                duration_ms,
+                e,
+                shape,
+            )
+            return
+
+        summary = summarize_explain(explain)
+        logger.warning(
+            "Slow MongoDB %s on %s took %.0f ms, examined %d documents and %d keys for %d returned, plan %s: %s",
+            command_name,
+            collection,
+            duration_ms,
+            summary.docs_examined,
+            summary.keys_examined,
+            summary.returned,
+            summary.plan,
+            shape,
+        )
@@ -0,0 +1,168 @@
+import asyncio
+import sys
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from beanie import Document, PydanticObjectId
+
+from app.api.event.schemas import EventFilter
+from app.api.event.service import EventService
+from app.api.user.schemas import UserFilter
+from app.api.user.service import UserRead, UserService
+from app.core.database import initialize_database
+from app.core.models.event import Event
+from app.core.models.user import Gender, User
+from app.core.utils.explain import summarize_explain
+
+NOW = datetime.now(timezone.utc)
+
+# Index of `Event.Settings` that every event search shape must use
+EVENT_SEARCH_INDEX = "search_location_category_start_end"
+# Index keys an event search may examine per event it reads. A 2dsphere index is scanned in
+# cells covering the search circle, so some keys of events just outside of it are examined too
+EVENT_MAX_KEYS_PER_RETURNED = 10
+
+# Representative filter combinations of `GET /users/`
+USER_QUERY_SHAPES: dict[str, UserFilter] = {
+    "no filters": UserFilter(),
+    "gender": UserFilter(gender=Gender.FEMALE),
+    "age": UserFilter(min_age=25, max_age=35),
+    "gender + age": UserFilter(gender=Gender.FEMALE, min_age=25, max_age=35),
+    "verified": UserFilter(verified=True),
+    "verified + gender + age": UserFilter(verified=True, gender=Gender.MALE, min_age=20, max_age=30),
+    "interests": UserFilter(interests=["Психология 🧠", "Кинотеатры 🎬"]),
+    "interests + gender + age": UserFilter(interests=["Психология 🧠"], gender=Gender.FEMALE, min_age=18, max_age=40),
+    "bounding box": UserFilter(min_latitude=55.5, min_longitude=37.3, max_latitude=56.0, max_longitude=37.9),
+    "near": UserFilter(latitude=55.75, longitude=37.62, radius_km=10),
+    "near + gender + age": UserFilter(
+        latitude=55.75,
+        longitude=37.62,
+        radius_km=25,
+        gender=Gender.MALE,
+        min_age=25,
+        max_age=35,
+    ),
+}
+
+# Representative filter combinations of `GET /events/`
+EVENT_QUERY_SHAPES: dict[str, EventFilter] = {
+    "near": EventFilter(latitude=55.75, longitude=37.62),
+    "near + window": EventFilter(latitude=55.75, longitude=37.62, date_from=NOW, date_to=NOW + timedelta(days=7)),
+    "near + category": EventFilter(latitude=55.75, longitude=37.62, category="Музыка"),
+    "near + window + category": EventFilter(
+        latitude=55.75,
+        longitude=37.62,
+        radius_km=10,
+        date_from=NOW,
+        date_to=NOW + timedelta(days=2),
+        category="Музыка",
+    ),
+}
+
+
+def _explain_user_command(filter_params: UserFilter, collection: str) -> dict:
+    """Build the command that `UserService.search_users` sends for a filter."""
+    users_query = UserService.build_search_query(filter_params, current_user_id=PydanticObjectId())
+    near = filter_params.near
+    if near is None:
+        return {
+            "find": collection,
+            "filter": users_query.get_filter_query(),
+            "sort": {"_id": 1},
+            "limit": filter_params.limit + 1,
+            "projection": UserRead.Settings.projection,
+        }
+    pipeline = UserService.build_geo_pipeline(filter_params, near, users_query.get_filter_query())
+    return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+
+
+def _explain_event_command(filter_params: EventFilter, collection: str) -> dict:
+    """Build the command that `EventService.search_events` sends for a filter."""
+    pipeline = EventService.build_search_pipeline(filter_params)
+    return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+
+
+async def _check(
+    model: type[Document],
+    shapes: dict[str, Any],
+    explain_command: Callable[[Any, str], dict],
+    index: str | None = None,
+    max_keys_per_returned: float | None = None,
+) -> list[str]:
+    """Explain the query shapes of a collection and print their plans.
+
+    Args:
+        model: Document model of the collection
+        shapes: Filters by shape name
+        explain_command: Builds the command of a filter, given the collection name
+        index: Index the winning plan of every shape must use
+        max_keys_per_returned: Most index keys a shape may examine per document the query reads
+
+    Returns:
+        Shapes that fall back to COLLSCAN or break the other requirements, with the reason
+    """
+    collection = model.get_motor_collection()
+    database = collection.database
+
+    used_indexes = set()
+    failed = []
+    print(f"\n{collection.name}")
+    print(f"{'shape':<28} {'returned':>8} {'keys':>8} {'docs':>8} {'docs/ret':>8}  plan")
+    for name, filter_params in shapes.items():
+        explain = await database.command(
+            "explain",
+            explain_command(filter_params, collection.name),
+            verbosity="executionStats",
+        )
+        summary = summarize_explain(explain)
+        used_indexes |= summary.indexes
+        if summary.collscan:
+            failed.append(f"{collection.name}: {name} scans the collection")
+        if index is not None and summary.indexes != {index}:
+            failed.append(f"{collection.name}: {name} does not use {index} alone")
+        keys_ratio = summary.keys_examined / max(summary.returned, 1)
+        if max_keys_per_returned is not None and keys_ratio > max_keys_per_returned:
+            failed.append(f"{collection.name}: {name} examines {keys_ratio:.1f} keys per document")
+        ratio = summary.docs_examined / max(summary.returned, 1)
+        print(
+            f"{name:<28} {summary.returned:>8} {summary.keys_examined:>8} {summary.docs_examined:>8} "
+            f"{ratio:>8.1f}  {summary.plan}",
+        )
+
+    unused = set(await collection.index_information()) - used_indexes - {"_id_"}
+    if unused:
+        print(f"Indexes not used by any shape: {', '.join(sorted(unused))}")
+    return failed
+
+
+async def main() -> int:
+    """Explains the user and event search query shapes and flags the ones that scan the collection.
+
+    A docs/ret ratio close to 1 means every filter is checked on index keys
+    and only returned documents are fetched. Event searches must also use
+    `EVENT_SEARCH_INDEX` alone and examine at most `EVENT_MAX_KEYS_PER_RETURNED`
+    keys per event read by `$geoNear`. They can't be index-only: `$geoNear`
+    fetches every candidate, because index keys only hold the cells covering a
+    location, not the point its exact distance is computed from.
+    """
+    await initialize_database()
+
+    failed = await _check(User, USER_QUERY_SHAPES, _explain_user_command)
+    failed += await _check(
+        Event,
+        EVENT_QUERY_SHAPES,
+        _explain_event_command,
+        index=EVENT_SEARCH_INDEX,
+        max_keys_per_returned=EVENT_MAX_KEYS_PER_RETURNED,
+    )
+    if failed:
+        print("\nFailed checks:")
+        for failure in failed:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+import sys
+
+from app.core.database import create_indexes, initialize_database
+from app.core.models import User
+from app.core.scripts.user.migrate_location import main as migrate_locations
+from app.core.scripts.user.unique_credentials import drop_plain_indexes, find_duplicates
+
+
+async def main(batch_size: int):
+    """Migrates the database: converts legacy user locations, then creates missing indexes.
+
+    Stops before creating indexes if usernames or emails are duplicated
+    regardless of case, because their unique indexes can't be built.
+
+    Runs once per deploy, before the app starts. The app itself only checks
+    that the indexes exist, see `MONGO_INDEX_MODE`.
+    """
+    await migrate_locations(batch_size)
+
+    client = await initialize_database(index_mode="skip")
+    users = User.get_motor_collection()
+    duplicates = await find_duplicates(users)
+    if duplicates:
+        for field, values in duplicates.items():
+            print(f"Duplicate {field}s, ignoring case: {', '.join(values)}")
+        client.close()
+        sys.exit(1)
+
+    created = await create_indexes()
+    print(f"Created indexes: {', '.join(created)}" if created else "Indexes are up to date")
+    await drop_plain_indexes(users)
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Number of documents per bulk write")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
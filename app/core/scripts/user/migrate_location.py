@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from app.config import settings
+
+# The coordinate indexes of the old schema and the plain 2dsphere index, which
+# is replaced by the compound `search_location_gender_birth_date` one
+LEGACY_INDEXES = ["location.longitude_1", "location.latitude_1", "location_2dsphere"]
+
+
+async def main(batch_size: int):
+    """Converts legacy `{latitude, longitude}` user locations to GeoJSON points.
+
+    Runs before Beanie is initialized, because the 2dsphere index on `location`
+    can't be built while legacy documents are present.
+    """
+    client = AsyncIOMotorClient(
+        settings.MONGO_URI,
+        connectTimeoutMS=settings.MONGO_TIMEOUT,
+        timeoutMS=settings.MONGO_TIMEOUT,
+    )
+    collection = client[settings.MONGO_DB]["users"]
+
+    converted = 0
+    last_id = None
+    while True:
+        query: dict = {"location.latitude": {"$exists": True}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await collection.find(query, {"location": 1}).sort("_id", 1).limit(batch_size).to_list(None)
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne(
+                {"_id": doc["_id"], "location.latitude": {"$exists": True}},
+                {
+                    "$set": {
+                        "location": {
+                            "type": "Point",
+                            "coordinates": [doc["location"]["longitude"], doc["location"]["latitude"]],
+                        },
+                    },
+                },
+            )
+            for doc in batch
+        ]
+        result = await collection.bulk_write(operations, ordered=False)
+        converted += result.modified_count
+        last_id = batch[-1]["_id"]
+
+    print(f"Converted {converted} user locations")
+
+    for index in LEGACY_INDEXES:
+        try:
+            await collection.drop_index(index)
+            print(f"Dropped index {index}")
+        except OperationFailure:
+            pass
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Number of documents per bulk write")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,38 @@
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure
+
+from app.core.models.user import CASE_INSENSITIVE
+
+# The plain indexes replaced by the case-insensitive unique `username_unique` and `email_unique` ones
+PLAIN_INDEXES = ["username_1", "email_1"]
+
+
+async def find_duplicates(collection: AsyncIOMotorCollection) -> dict[str, list[str]]:
+    """Finds usernames and emails shared by several users regardless of case.
+
+    The unique indexes can't be built while any exist, so they have to be
+    resolved by hand first.
+
+    Returns:
+        Duplicated values by field
+    """
+    duplicates = {}
+    for field in ("username", "email"):
+        pipeline = [
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+        groups = await collection.aggregate(pipeline, collation=CASE_INSENSITIVE, allowDiskUse=True).to_list(None)
+        if groups:
+            duplicates[field] = [group["_id"] for group in groups]
+    return duplicates
+
+
+async def drop_plain_indexes(collection: AsyncIOMotorCollection):
+    """Drops the plain username and email indexes, once the unique ones exist."""
+    for index in PLAIN_INDEXES:
+        try:
+            await collection.drop_index(index)
+            print(f"Dropped index {index}")
+        except OperationFailure:
+            pass
@@ -1,39 +1,92 @@
 import asyncio
+import hashlib
 import os
 
 import anyio
+from pymongo import DeleteMany, UpdateOne
 
+from app.api.user_interest.service import UserInterestService
 from app.core.database import initialize_database
 from app.core.models import UserInterest
+from app.core.services.redis_service import RedisService
 
 PWD = os.path.dirname(os.path.abspath(__file__))
 
+# Collection and ID of the document holding the hash of the last imported file
+META_COLLECTION = "user_interests_meta"
+SOURCE_HASH_ID = "source_hash"
 
-async def main():
-    """Imports user interests from file."""
-    await initialize_database()
-
-    async with await anyio.open_file(os.path.join(PWD, "interests.txt"), "r", encoding="utf-8") as f:
-        interests = await f.readlines()
-        interests = list(map(str.strip, interests))
 
-    to_create = []
+def parse_interests(lines: list[str]) -> list[tuple[str, str]]:
+    """Parse `(category, name)` pairs from the lines of the interests file."""
+    interests = []
     category = ""
-    for interest in interests:
-        if interest.endswith(":"):
-            category = interest.rstrip(":")
-        elif interest:
+    for line in map(str.strip, lines):
+        if line.endswith(":"):
+            category = line.rstrip(":")
+        elif line:
             if not category:
                 raise ValueError("Category is not set")
-            to_create.append(UserInterest(category=category, name=interest))
+            interests.append((category, line))
 
-    if not to_create:
+    if not interests:
         raise ValueError("No interests to create")
+    return interests
+
+
+async def main():
+    """Imports user interests from file.
+
+    Does nothing if the file did not change since the last run and the
+    catalogue is not empty. Otherwise the difference with the collection is
+    applied in one bulk write, so the catalogue is never empty while the import
+    is running. The hash of the imported file is kept in MongoDB next to the
+    catalogue, so it can't get out of step with it. The hash is stored only
+    after workers were told to rebuild their catalogue.
+    """
+    async with await anyio.open_file(os.path.join(PWD, "interests.txt"), "rb") as f:
+        source = await f.read()
+    source_hash = hashlib.sha256(source).hexdigest()
+
+    client = await initialize_database()
+    await RedisService.connect()
+    try:
+        collection = UserInterest.get_motor_collection()
+        meta = collection.database[META_COLLECTION]
+        imported = await meta.find_one({"_id": SOURCE_HASH_ID})
+        if imported is not None and imported["hash"] == source_hash and await collection.find_one({}, {"_id": 1}):
+            print("User interests are up to date")
+            return
+
+        interests = parse_interests(source.decode("utf-8").splitlines())
+        existing = {
+            (doc["category"], doc["name"]): doc["_id"] async for doc in collection.find({}, {"category": 1, "name": 1})
+        }
+
+        wanted = set(interests)
+        to_create = [key for key in interests if key not in existing]
+        to_delete = [_id for key, _id in existing.items() if key not in wanted]
 
-    print(f"Creating {len(to_create)} interests")
+        print(f"Creating {len(to_create)} interests, deleting {len(to_delete)} interests")
 
-    await UserInterest.delete_all()
-    await UserInterest.insert_many(to_create)
+        operations: list[UpdateOne | DeleteMany] = [
+            UpdateOne(
+                {"category": category, "name": name},
+                {"$setOnInsert": {"category": category, "name": name}},
+                upsert=True,
+            )
+            for category, name in to_create
+        ]
+        if to_delete:
+            operations.append(DeleteMany({"_id": {"$in": to_delete}}))
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        # Bumped even without changes, as a run that failed after writing them left workers on the old catalogue
+        await UserInterestService.bump_version()
+        await meta.update_one({"_id": SOURCE_HASH_ID}, {"$set": {"hash": source_hash}}, upsert=True)
+    finally:
+        await RedisService.close()
+        client.close()
 
 
 if __name__ == "__main__":
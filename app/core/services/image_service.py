@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.core.utils.image import MAX_IMAGE_PIXELS, ImageDerivative, make_derivatives
+
+logger = logging.getLogger(__name__)
+
+
+class ImageService:
+    """Service for processing images in a process pool.
+
+    Decoding and resizing are CPU-bound and hold the GIL, so they run in worker
+    processes. When too many images are already waiting for a worker, new ones
+    are rejected with 503 instead of queueing up behind each other.
+    """
+
+    _executor: ProcessPoolExecutor | None = None
+    _pending: int = 0
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+        return cls._executor
+
+    @classmethod
+    async def create_derivatives(cls, data: bytes) -> list[ImageDerivative]:
+        """Validate an image and make its resized copies of `PROFILE_PICTURE_SIZES`.
+
+        Args:
+            data: Image file content
+
+        Returns:
+            Resized copies without metadata, smallest first
+
+        Raises:
+            HTTPException (400): If the data is not a valid JPEG, PNG or WebP image, or has too many pixels
+            HTTPException (503): If the worker pool queue is full
+        """
+        if cls._pending >= settings.IMAGE_MAX_PENDING:
+            logger.warning("Image processing rejected, %d images pending", cls._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        cls._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                cls._get_executor(),
+                make_derivatives,
+                data,
+                sorted(settings.PROFILE_PICTURE_SIZES),
+                settings.PROFILE_PICTURE_FORMAT.upper(),
+                settings.PROFILE_PICTURE_QUALITY,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File must be a JPEG, PNG or WebP image of at most {MAX_IMAGE_PIXELS // 1_000_000} megapixels",
+            ) from e
+        finally:
+            cls._pending -= 1
+
+    @classmethod
+    def shutdown(cls):
+        """Shut down the worker pool."""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
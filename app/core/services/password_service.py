@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.core.monitoring.metrics import (
+    PASSWORD_OPERATION_DURATION,
+    PASSWORD_OPERATIONS_PENDING,
+    PASSWORD_OPERATIONS_REJECTED,
+)
+from app.core.utils.password import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordService:
+    """Service for hashing and verifying passwords off the event loop.
+
+    bcrypt is deliberately slow, so every call is sent to a bounded worker pool.
+    When too many calls are already waiting for a worker, new ones are rejected
+    with 503 instead of queueing up behind each other.
+    """
+
+    _executor: Executor | None = None
+    _pending: int = 0
+
+    @classmethod
+    def _get_executor(cls) -> Executor:
+        if cls._executor is None:
+            if settings.PASSWORD_HASH_EXECUTOR == "process":
+                cls._executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+            else:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash",
+                )
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, operation: str, func: Callable[..., T], *args: str) -> T:
+        if cls._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            PASSWORD_OPERATIONS_REJECTED.labels(operation).inc()
+            logger.warning("Password %s rejected, %d calls pending", operation, cls._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        cls._pending += 1
+        PASSWORD_OPERATIONS_PENDING.inc()
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls._get_executor(), func, *args)
+        finally:
+            cls._pending -= 1
+            PASSWORD_OPERATIONS_PENDING.dec()
+            PASSWORD_OPERATION_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+    @classmethod
+    async def hash_password(cls, password: str) -> str:
+        """Hash a password in the worker pool.
+
+        Args:
+            password: Plain text password to hash
+
+        Returns:
+            Hashed password as a string
+
+        Raises:
+            HTTPException (503): If the worker pool queue is full
+        """
+        return await cls._run("hash", get_password_hash, password)
+
+    @classmethod
+    async def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash in the worker pool.
+
+        Args:
+            plain_password: Plain text password to verify
+            hashed_password: Hashed password to compare against
+
+        Returns:
+            True if password matches hash, False otherwise
+
+        Raises:
+            HTTPException (503): If the worker pool queue is full
+        """
+        return await cls._run("verify", verify_password, plain_password, hashed_password)
+
+    @classmethod
+    def shutdown(cls):
+        """Shut down the worker pool."""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
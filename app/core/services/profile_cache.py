@@ -0,0 +1,188 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.monitoring.metrics import PROFILE_CACHE_LOOKUPS
+
+from .redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedProfile:
+    """Public profile of a user, serialized to JSON, with its ETag."""
+
+    content: str
+    etag: str
+
+
+class ProfileCache:
+    """Read-through cache of serialized public profiles in Redis.
+
+    Profiles are stored as the response body, so a hit is sent without touching
+    MongoDB or pydantic. Concurrent misses of the same profile on a worker share
+    one load, so a burst of views of a profile that just left the cache reads
+    it from the database once per worker rather than once per request. Misses
+    of a batch are loaded together, in one query.
+    """
+
+    _loading: dict[str, asyncio.Future[CachedProfile | None]] = {}
+    _tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"profile:{user_id}"
+
+    @classmethod
+    async def get(cls, user_id: str, load: Callable[[], Awaitable[CachedProfile | None]]) -> CachedProfile | None:
+        """Get a profile from the cache, loading it on a miss.
+
+        Args:
+            user_id: User ID of the profile
+            load: Loads the profile from the database, None if the user does not exist
+
+        Returns:
+            Profile or None if the user does not exist
+        """
+
+        async def load_many(_: list[str]) -> dict[str, CachedProfile]:
+            profile = await load()
+            return {} if profile is None else {user_id: profile}
+
+        profiles = await cls.get_many([user_id], load_many)
+        return profiles.get(user_id)
+
+    @classmethod
+    async def get_many(
+        cls,
+        user_ids: list[str],
+        load_many: Callable[[list[str]], Awaitable[dict[str, CachedProfile]]],
+    ) -> dict[str, CachedProfile]:
+        """Get profiles from the cache, loading the missing ones together.
+
+        Args:
+            user_ids: Distinct user IDs of the profiles
+            load_many: Loads profiles from the database by user ID, without the users that do not exist
+
+        Returns:
+            Profiles by user ID, without the users that do not exist
+        """
+        profiles: dict[str, CachedProfile] = {}
+        waiting = {user_id: cls._loading[user_id] for user_id in user_ids if user_id in cls._loading}
+        unknown = [user_id for user_id in user_ids if user_id not in waiting]
+        misses = []
+        if unknown:
+            cached = await cls._read(unknown)
+            for user_id, profile in zip(unknown, cached, strict=True):
+                if profile is not None:
+                    profiles[user_id] = profile
+                # Another request could have started loading while Redis was read
+                elif user_id in cls._loading:
+                    waiting[user_id] = cls._loading[user_id]
+                else:
+                    misses.append(user_id)
+        PROFILE_CACHE_LOOKUPS.labels("hit").inc(len(profiles))
+        PROFILE_CACHE_LOOKUPS.labels("miss").inc(len(misses))
+        PROFILE_CACHE_LOOKUPS.labels("coalesced").inc(len(waiting))
+        if misses:
+            waiting |= cls._start_loading(misses, load_many)
+
+        # A cancelled request must not cancel the load the others wait for
+        loaded = await asyncio.shield(asyncio.gather(*waiting.values()))
+        profiles |= {user_id: profile for user_id, profile in zip(waiting, loaded, strict=True) if profile is not None}
+        return profiles
+
+    @classmethod
+    async def _read(cls, user_ids: list[str]) -> list[CachedProfile | None]:
+        try:
+            async with RedisService.client().pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.hmget(cls._key(user_id), ["etag", "content"])
+                results = await pipe.execute()
+        except RedisError:
+            logger.exception("Failed to read profiles from Redis cache")
+            return [None] * len(user_ids)
+        return [
+            CachedProfile(content=content, etag=etag) if etag is not None and content is not None else None
+            for etag, content in results
+        ]
+
+    @classmethod
+    def _start_loading(
+        cls,
+        user_ids: list[str],
+        load_many: Callable[[list[str]], Awaitable[dict[str, CachedProfile]]],
+    ) -> dict[str, asyncio.Future[CachedProfile | None]]:
+        loop = asyncio.get_running_loop()
+        futures: dict[str, asyncio.Future[CachedProfile | None]] = {}
+        for user_id in user_ids:
+            futures[user_id] = cls._loading[user_id] = loop.create_future()
+        task = asyncio.create_task(cls._load(futures, load_many))
+        # The event loop only keeps weak references to tasks
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+        return futures
+
+    @classmethod
+    async def _load(
+        cls,
+        futures: dict[str, asyncio.Future[CachedProfile | None]],
+        load_many: Callable[[list[str]], Awaitable[dict[str, CachedProfile]]],
+    ):
+        try:
+            profiles = await load_many(list(futures))
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures.values():
+                future.set_exception(e)
+            return
+        else:
+            # Profiles invalidated while they were loading could be stale, so they are not stored
+            current = {
+                user_id: profile
+                for user_id, profile in profiles.items()
+                if cls._loading.get(user_id) is futures.get(user_id)
+            }
+        finally:
+            for user_id, future in futures.items():
+                if cls._loading.get(user_id) is future:
+                    del cls._loading[user_id]
+
+        for user_id, future in futures.items():
+            future.set_result(profiles.get(user_id))
+        await cls._store(current)
+
+    @classmethod
+    async def _store(cls, profiles: dict[str, CachedProfile]):
+        if not profiles:
+            return
+        try:
+            async with RedisService.client().pipeline(transaction=False) as pipe:
+                for user_id, profile in profiles.items():
+                    pipe.hset(cls._key(user_id), mapping={"etag": profile.etag, "content": profile.content})
+                    pipe.expire(cls._key(user_id), settings.PROFILE_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError:
+            logger.exception("Failed to write profiles to Redis cache")
+
+    @classmethod
+    async def invalidate(cls, user_id: str):
+        """Remove a profile from the cache after the user was updated.
+
+        Args:
+            user_id: User ID of the profile
+        """
+        # Requests from now on must not join a load that could have read the old profile
+        cls._loading.pop(user_id, None)
+        try:
+            await RedisService.client().delete(cls._key(user_id))
+        except RedisError:
+            logger.exception("Failed to delete profile from Redis cache")
@@ -1,17 +1,61 @@
-import redis
+import logging
+
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
 
 from app.config import settings
+from app.core.monitoring.redis import TimedRedis
 
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    password=settings.REDIS_PASSWORD,
-    decode_responses=True,
-)
+logger = logging.getLogger(__name__)
 
 
 class RedisService:
-    """Service for Redis operations."""
+    """Service for Redis operations.
+
+    The connection pool is opened and closed by the FastAPI lifespan hook.
+    """
+
+    _pool: ConnectionPool | None = None
+    _client: Redis | None = None
+
+    @classmethod
+    async def connect(cls):
+        """Create the connection pool and check that Redis is reachable."""
+        if cls._client is not None:
+            return
+        cls._pool = ConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_TIMEOUT,
+            decode_responses=True,
+        )
+        cls._client = TimedRedis(connection_pool=cls._pool)
+        await cls._client.ping()
+        logger.info("Redis connection pool initialized")
+
+    @classmethod
+    async def close(cls):
+        """Close the client and disconnect every pooled connection."""
+        if cls._client is not None:
+            await cls._client.aclose()
+        if cls._pool is not None:
+            await cls._pool.disconnect()
+        cls._client = None
+        cls._pool = None
+
+    @classmethod
+    def client(cls) -> Redis:
+        """Get the pooled Redis client.
+
+        Raises:
+            RuntimeError: If the connection pool was not initialized
+        """
+        if cls._client is None:
+            raise RuntimeError("Redis connection pool is not initialized")
+        return cls._client
 
     @staticmethod
     async def store_otp(user_id: str, otp: str, expiry_seconds: int = 600) -> bool:
@@ -26,10 +70,10 @@ class RedisService:
             True if stored successfully, False otherwise
         """
         try:
-            key = f"otp:{user_id}"
-            redis_client.set(key, otp, ex=expiry_seconds)
+            await RedisService.client().set(f"otp:{user_id}", otp, ex=expiry_seconds)
             return True
-        except Exception:
+        except RedisError:
+            logger.exception("Failed to store OTP")
             return False
 
     @staticmethod
@@ -43,14 +87,35 @@ class RedisService:
             OTP if found and not expired, None otherwise
         """
         try:
-            key = f"otp:{user_id}"
-            value = redis_client.get(key)
+            value = await RedisService.client().get(f"otp:{user_id}")
             if value is None:
                 return None
             return str(value)
-        except Exception:
+        except RedisError:
+            logger.exception("Failed to get OTP")
             return None
 
+    @staticmethod
+    async def verify_otp(user_id: str, otp: str) -> bool:
+        """Check OTP and consume it in one atomic step.
+
+        The stored OTP is removed with GETDEL, so it can be used only once
+        even if several requests try to verify it at the same time.
+
+        Args:
+            user_id: User's ID
+            otp: One-time password to check
+
+        Returns:
+            True if OTP matched, False otherwise
+        """
+        try:
+            value = await RedisService.client().getdel(f"otp:{user_id}")
+        except RedisError:
+            logger.exception("Failed to verify OTP")
+            return False
+        return value is not None and str(value) == otp
+
     @staticmethod
     async def delete_otp(user_id: str) -> bool:
         """Delete OTP from Redis.
@@ -62,8 +127,8 @@ class RedisService:
             True if deleted successfully, False otherwise
         """
         try:
-            key = f"otp:{user_id}"
-            redis_client.delete(key)
+            await RedisService.client().delete(f"otp:{user_id}")
             return True
-        except Exception:
+        except RedisError:
+            logger.exception("Failed to delete OTP")
             return False
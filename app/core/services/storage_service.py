@@ -0,0 +1,195 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import IO, Any, TypeVar
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.client import BaseClient
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.core.monitoring.boto import instrument_s3_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MB = 1024 * 1024
+
+
+class StorageService:
+    """Service for storing files in AWS S3 without blocking the event loop.
+
+    boto3 is synchronous, so every call that talks to S3 is sent to a bounded
+    thread pool. Large uploads are streamed from the file object in multipart
+    chunks, so a file is never read into memory at once. When too many calls are
+    already waiting for a worker, new ones are rejected with 503.
+    """
+
+    _client: BaseClient | None = None
+    _executor: ThreadPoolExecutor | None = None
+    _pending: int = 0
+
+    @classmethod
+    def client(cls) -> BaseClient:
+        """Get the S3 client, creating it on first use."""
+        if cls._client is None:
+            cls._client = boto3.client(
+                "s3",
+                endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                aws_access_key_id=settings.AWS_S3_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_S3_SECRET_ACCESS_KEY,
+                config=BotoConfig(
+                    retries={
+                        "max_attempts": 3,
+                        "mode": "standard",
+                    },
+                    connect_timeout=5,
+                    read_timeout=10,
+                    region_name=settings.AWS_S3_REGION,
+                    max_pool_connections=settings.AWS_S3_WORKERS * settings.AWS_S3_MULTIPART_CONCURRENCY,
+                ),
+            )
+            instrument_s3_client(cls._client)
+        return cls._client
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=settings.AWS_S3_WORKERS, thread_name_prefix="s3")
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if cls._pending >= settings.AWS_S3_MAX_PENDING:
+            logger.warning("S3 call rejected, %d calls pending", cls._pending)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        cls._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls._get_executor(), partial(func, *args, **kwargs))
+        finally:
+            cls._pending -= 1
+
+    @staticmethod
+    def object_url(key: str) -> str:
+        """Get the public URL of an object."""
+        return f"{settings.AWS_S3_ENDPOINT_URL}/{settings.AWS_S3_BUCKET}/{key}"
+
+    @classmethod
+    async def upload_fileobj(cls, fileobj: IO[bytes], key: str, content_type: str):
+        """Upload a file object, in multipart chunks if it is large.
+
+        Args:
+            fileobj: Binary file object positioned at the start of the data
+            key: Object key
+            content_type: MIME type of the data
+
+        Raises:
+            HTTPException (503): If the worker pool queue is full
+        """
+        transfer_config = TransferConfig(
+            multipart_threshold=settings.AWS_S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.AWS_S3_MULTIPART_CHUNK_MB * MB,
+            max_concurrency=settings.AWS_S3_MULTIPART_CONCURRENCY,
+        )
+        await cls._run(
+            cls.client().upload_fileobj,
+            fileobj,
+            settings.AWS_S3_BUCKET,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=transfer_config,
+        )
+
+    @classmethod
+    def create_presigned_post(cls, key: str, content_type: str, max_size: int) -> dict[str, Any]:
+        """Create a presigned POST that lets a client upload one object directly.
+
+        Signing happens locally, so no request is sent to S3.
+
+        Args:
+            key: Object key the client may upload to
+            content_type: MIME type the client must send
+            max_size: Maximum size of the object in bytes
+
+        Returns:
+            URL to post the form to and the form fields to send with the file
+        """
+        return cls.client().generate_presigned_post(
+            Bucket=settings.AWS_S3_BUCKET,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=settings.AWS_S3_PRESIGNED_EXPIRE_SECONDS,
+        )
+
+    @classmethod
+    async def head_object(cls, key: str) -> dict[str, Any] | None:
+        """Get the metadata of an object.
+
+        Args:
+            key: Object key
+
+        Returns:
+            Object metadata, or None if the object does not exist
+
+        Raises:
+            HTTPException (503): If the worker pool queue is full
+        """
+        try:
+            return await cls._run(cls.client().head_object, Bucket=settings.AWS_S3_BUCKET, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    @classmethod
+    async def download(cls, key: str) -> bytes:
+        """Download the content of an object.
+
+        Args:
+            key: Object key
+
+        Returns:
+            Object content
+
+        Raises:
+            HTTPException (503): If the worker pool queue is full
+        """
+
+        def read() -> bytes:
+            return cls.client().get_object(Bucket=settings.AWS_S3_BUCKET, Key=key)["Body"].read()
+
+        return await cls._run(read)
+
+    @classmethod
+    async def delete_object(cls, key: str):
+        """Delete an object.
+
+        Args:
+            key: Object key
+
+        Raises:
+            HTTPException (503): If the worker pool queue is full
+        """
+        await cls._run(cls.client().delete_object, Bucket=settings.AWS_S3_BUCKET, Key=key)
+
+    @classmethod
+    def shutdown(cls):
+        """Shut down the worker pool."""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
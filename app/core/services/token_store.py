@@ -0,0 +1,188 @@
+import asyncio
+import contextlib
+import logging
+import time
+from enum import IntEnum
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+from .redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+DENYLIST_KEY = "auth:denylist"
+
+# Moves a family to a new refresh token only if the presented one is the current one.
+# Presenting an older token of the family means it was stolen, so the family is revoked.
+ROTATE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return -1
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class Rotation(IntEnum):
+    """Outcome of a refresh token rotation."""
+
+    REUSED = -1
+    REVOKED = 0
+    ROTATED = 1
+
+
+class TokenStore:
+    """Store of refresh token families and of revoked families.
+
+    Every login starts a family of tokens. Redis keeps the ID of the only
+    refresh token of a family that may be used, until it expires, and every
+    refresh replaces it. Revoked families go to a denylist in Redis, kept for
+    the lifetime of access tokens. Each worker checks access tokens against a
+    local snapshot of the denylist, synced every `AUTH_DENYLIST_SYNC_SECONDS`,
+    so authenticating a request needs no network round trip. Revocations take
+    effect at once on the worker that makes them and within one sync on others.
+    """
+
+    _denied: frozenset[str] = frozenset()
+    _sync_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _family_key(family: str) -> str:
+        return f"auth:family:{family}"
+
+    @staticmethod
+    def _user_families_key(user_id: str) -> str:
+        return f"auth:user_families:{user_id}"
+
+    @classmethod
+    async def start_family(cls, user_id: str, family: str, token_id: str):
+        """Start a family of tokens with its first refresh token.
+
+        Args:
+            user_id: ID of the user who logged in
+            family: ID of the new family
+            token_id: ID of the first refresh token
+
+        Raises:
+            RedisError: If the store is unavailable
+        """
+        ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        async with RedisService.client().pipeline(transaction=True) as pipe:
+            pipe.set(cls._family_key(family), token_id, ex=ttl)
+            pipe.sadd(cls._user_families_key(user_id), family)
+            pipe.expire(cls._user_families_key(user_id), ttl)
+            await pipe.execute()
+
+    @classmethod
+    async def rotate(cls, user_id: str, family: str, token_id: str, new_token_id: str) -> Rotation:
+        """Replace the current refresh token of a family, revoking the family if an old one is reused.
+
+        Args:
+            user_id: ID of the user the family belongs to
+            family: ID of the family
+            token_id: ID of the presented refresh token
+            new_token_id: ID of the refresh token that replaces it
+
+        Returns:
+            Whether the token was rotated, was revoked or expired, or was reused
+
+        Raises:
+            RedisError: If the store is unavailable
+        """
+        result = await RedisService.client().eval(
+            ROTATE_SCRIPT,
+            2,
+            cls._family_key(family),
+            cls._user_families_key(user_id),
+            token_id,
+            new_token_id,
+            settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+            family,
+        )
+        rotation = Rotation(int(result))
+        if rotation == Rotation.REUSED:
+            await cls._deny([family])
+        return rotation
+
+    @classmethod
+    async def revoke_family(cls, family: str):
+        """Revoke the refresh token of a family and the access tokens issued with it.
+
+        Raises:
+            RedisError: If the store is unavailable
+        """
+        await RedisService.client().delete(cls._family_key(family))
+        await cls._deny([family])
+
+    @classmethod
+    async def revoke_user(cls, user_id: str):
+        """Revoke every family of a user, logging them out everywhere.
+
+        Raises:
+            RedisError: If the store is unavailable
+        """
+        client = RedisService.client()
+        families = list(await client.smembers(cls._user_families_key(user_id)))
+        if not families:
+            return
+        await client.delete(*(cls._family_key(family) for family in families), cls._user_families_key(user_id))
+        await cls._deny(families)
+
+    @classmethod
+    async def _deny(cls, families: list[str]):
+        now = time.time()
+        ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        async with RedisService.client().pipeline(transaction=True) as pipe:
+            pipe.zadd(DENYLIST_KEY, dict.fromkeys(families, now + ttl))
+            pipe.zremrangebyscore(DENYLIST_KEY, "-inf", now)
+            pipe.expire(DENYLIST_KEY, ttl)
+            await pipe.execute()
+        cls._denied = cls._denied.union(families)
+
+    @classmethod
+    def is_revoked(cls, family: str) -> bool:
+        """Check the local denylist snapshot for a family, without a network round trip."""
+        return family in cls._denied
+
+    @classmethod
+    async def sync(cls):
+        """Replace the local denylist snapshot with the families still denied in Redis."""
+        denied = await RedisService.client().zrangebyscore(DENYLIST_KEY, time.time(), "+inf")
+        cls._denied = frozenset(denied)
+
+    @classmethod
+    async def _sync_periodically(cls):
+        while True:
+            await asyncio.sleep(settings.AUTH_DENYLIST_SYNC_SECONDS)
+            try:
+                await cls.sync()
+            except RedisError:
+                logger.exception("Failed to sync the token denylist, keeping the last snapshot")
+
+    @classmethod
+    async def start(cls):
+        """Load the denylist and keep it in sync."""
+        try:
+            await cls.sync()
+        except RedisError:
+            logger.exception("Failed to load the token denylist")
+        if cls._sync_task is None:
+            cls._sync_task = asyncio.create_task(cls._sync_periodically())
+
+    @classmethod
+    async def stop(cls):
+        """Stop syncing the denylist."""
+        if cls._sync_task is not None:
+            cls._sync_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cls._sync_task
+            cls._sync_task = None
@@ -0,0 +1,180 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core.models.user import User
+from app.core.monitoring.metrics import USER_CACHE_LOCAL_SIZE, USER_CACHE_LOOKUPS
+from app.core.utils.ttl_cache import TTLCache
+
+from .redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "user-cache:invalidate"
+
+# Only login reads the password hash, from the database, so it is blanked out rather than cached
+REDACTED_FIELDS = {"password_hash": ""}
+
+
+class UserCache:
+    """Two-tier read-through cache of users.
+
+    The first tier is a small in-process TTL/LRU cache, the second one is shared
+    by every worker in Redis. Writes go through both tiers and are announced
+    over Redis pub/sub, so other workers drop their local copy. Users read on a
+    miss are only cached if no write-through cached them meanwhile. Cached users
+    have an empty `password_hash`, so the hash never leaves MongoDB.
+    """
+
+    _local: TTLCache[str, str] = TTLCache(
+        max_size=settings.USER_CACHE_LOCAL_MAX_SIZE,
+        ttl_seconds=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+    )
+    _instance_id: str = uuid.uuid4().hex
+    _listener: asyncio.Task | None = None
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _serialize(user: User) -> str:
+        return user.model_copy(update=REDACTED_FIELDS).model_dump_json()
+
+    @classmethod
+    async def get_user(cls, user_id: str) -> User | None:
+        """Get a user from the cache, loading it from the database on a miss.
+
+        Args:
+            user_id: User ID to find
+
+        Returns:
+            User object without its password hash, or None if the user does not exist
+        """
+        raw = cls._local.get(user_id)
+        if raw is not None:
+            USER_CACHE_LOOKUPS.labels("local").inc()
+            return User.model_validate_json(raw)
+
+        try:
+            raw = await RedisService.client().get(cls._key(user_id))
+        except RedisError:
+            logger.exception("Failed to read user from Redis cache")
+            raw = None
+        if raw is not None:
+            USER_CACHE_LOOKUPS.labels("redis").inc()
+            cls._fill_local(user_id, raw)
+            return User.model_validate_json(raw)
+
+        USER_CACHE_LOOKUPS.labels("database").inc()
+        user = await User.get(user_id)
+        if user is None:
+            return None
+        raw = cls._serialize(user)
+        await cls._fill(user_id, raw)
+        # The caller gets the user as it would come from the cache
+        return User.model_validate_json(raw)
+
+    @classmethod
+    def _fill_local(cls, user_id: str, raw: str):
+        # A write-through while the user was read is newer, so it is not replaced
+        if cls._local.get(user_id) is None:
+            cls._local.set(user_id, raw)
+
+    @classmethod
+    async def _fill(cls, user_id: str, raw: str):
+        """Cache a user read from the database, unless a write-through cached a newer one meanwhile."""
+        try:
+            stored = await RedisService.client().set(
+                cls._key(user_id),
+                raw,
+                ex=settings.USER_CACHE_REDIS_TTL_SECONDS,
+                nx=True,
+            )
+        except RedisError:
+            logger.exception("Failed to write user to Redis cache")
+            stored = True
+        if stored:
+            cls._fill_local(user_id, raw)
+
+    @classmethod
+    async def _store(cls, user_id: str, raw: str):
+        cls._local.set(user_id, raw)
+        try:
+            await RedisService.client().set(cls._key(user_id), raw, ex=settings.USER_CACHE_REDIS_TTL_SECONDS)
+        except RedisError:
+            logger.exception("Failed to write user to Redis cache")
+
+    @classmethod
+    async def _publish(cls, user_id: str):
+        try:
+            await RedisService.client().publish(INVALIDATION_CHANNEL, f"{cls._instance_id}:{user_id}")
+        except RedisError:
+            logger.exception("Failed to publish user cache invalidation")
+
+    @classmethod
+    async def set_user(cls, user: User):
+        """Write an updated user through both cache tiers.
+
+        Args:
+            user: User that was just written to the database
+        """
+        user_id = str(user.id)
+        await cls._store(user_id, cls._serialize(user))
+        await cls._publish(user_id)
+
+    @classmethod
+    async def invalidate(cls, user_id: str):
+        """Remove a user from both cache tiers on every worker.
+
+        Args:
+            user_id: User ID to remove
+        """
+        cls._local.pop(user_id)
+        try:
+            await RedisService.client().delete(cls._key(user_id))
+        except RedisError:
+            logger.exception("Failed to delete user from Redis cache")
+        await cls._publish(user_id)
+
+    @classmethod
+    async def _listen(cls):
+        while True:
+            try:
+                async with RedisService.client().pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # Messages could have been missed while we were not subscribed
+                    cls._local.clear()
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is None:
+                            continue
+                        sender, _, user_id = str(message["data"]).partition(":")
+                        if sender != cls._instance_id:
+                            cls._local.pop(user_id)
+            except RedisError:
+                logger.exception("User cache invalidation listener failed, reconnecting")
+                cls._local.clear()
+                await asyncio.sleep(1)
+
+    @classmethod
+    def start(cls):
+        """Start listening for invalidations from other workers."""
+        if cls._listener is None:
+            cls._listener = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def stop(cls):
+        """Stop listening for invalidations."""
+        if cls._listener is not None:
+            cls._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cls._listener
+            cls._listener = None
+
+
+USER_CACHE_LOCAL_SIZE.set_function(lambda: len(UserCache._local))
@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """Encode the sort key of the last returned item into an opaque cursor.
+
+    Args:
+        values: JSON-serializable sort key values
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Sort key values
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, dict):
+        raise ValueError("Malformed cursor")
+    return values
@@ -0,0 +1,56 @@
+import hashlib
+
+from fastapi import Response, status
+
+
+def make_etag(content: bytes) -> str:
+    """Make a strong ETag from response content."""
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header matches an ETag.
+
+    Args:
+        if_none_match: Value of the If-None-Match header
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client already has the current version
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def json_response(
+    content: bytes | str,
+    etag: str,
+    if_none_match: str | None,
+    gzipped: bytes | None = None,
+    accept_encoding: str | None = None,
+) -> Response:
+    """Build a JSON response from serialized content, or 304 if the client has it.
+
+    Args:
+        content: Serialized JSON
+        etag: ETag of the content
+        if_none_match: Value of the If-None-Match header
+        gzipped: Content compressed in advance, sent to clients that accept gzip
+        accept_encoding: Value of the Accept-Encoding header
+
+    Returns:
+        Response with the ETag header set
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if gzipped is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if accept_encoding and "gzip" in accept_encoding:
+            # Responses with Content-Encoding are passed through by GZipMiddleware
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=gzipped, media_type="application/json", headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class ExplainSummary:
+    """What an `explain("executionStats")` of a MongoDB command shows."""
+
+    returned: int
+    keys_examined: int
+    docs_examined: int
+    stages: frozenset[str]
+    indexes: frozenset[str]
+
+    @property
+    def collscan(self) -> bool:
+        """Whether the winning plan scans the whole collection."""
+        return "COLLSCAN" in self.stages
+
+    @property
+    def plan(self) -> str:
+        """Indexes of the winning plan, marked if it scans the whole collection."""
+        plan = ", ".join(sorted(self.indexes)) or "no index"
+        return f"COLLSCAN ({plan})" if self.collscan else plan
+
+
+def walk(node: Any, key: str) -> list[Any]:
+    """Collect every value of a key in a nested explain document."""
+    found = []
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if k == key:
+                found.append(v)
+            found.extend(walk(v, key))
+    elif isinstance(node, list):
+        for item in node:
+            found.extend(walk(item, key))
+    return found
+
+
+def summarize_explain(explain: dict) -> ExplainSummary:
+    """Summarize an explain of a find or an aggregation, in any of the plan formats.
+
+    Args:
+        explain: Result of the `explain` command with `executionStats` verbosity
+
+    Returns:
+        Numbers of returned and examined documents and the winning plan
+    """
+    winning_plans = walk(explain, "winningPlan")
+    stats = next(iter(walk(explain, "executionStats")), {})
+    return ExplainSummary(
+        returned=stats.get("nReturned", 0),
+        keys_examined=stats.get("totalKeysExamined", 0),
+        docs_examined=stats.get("totalDocsExamined", 0),
+        stages=frozenset(walk(winning_plans, "stage")),
+        indexes=frozenset(walk(winning_plans, "indexName")),
+    )
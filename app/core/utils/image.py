@@ -0,0 +1,87 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Formats accepted from clients, by the MIME type of their magic bytes
+ACCEPTED_FORMATS = {"image/jpeg": "JPEG", "image/png": "PNG", "image/webp": "WEBP"}
+
+# Pictures larger than this are rejected from their header, before decoding.
+# Pillow itself only warns above its limit and raises above twice it
+MAX_IMAGE_PIXELS = 40_000_000
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+
+@dataclass(frozen=True)
+class ImageDerivative:
+    """Resized copy of an image."""
+
+    size: int
+    width: int
+    height: int
+    content: bytes
+
+
+def sniff_image_type(header: bytes) -> str | None:
+    """Detect the type of an image from its first bytes, ignoring the file name.
+
+    Args:
+        header: At least the first 12 bytes of the file
+
+    Returns:
+        MIME type of the image, or None if it is not a JPEG, PNG or WebP image
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def make_derivatives(data: bytes, sizes: Sequence[int], image_format: str, quality: int) -> list[ImageDerivative]:
+    """Decode an image and encode resized copies of it without metadata.
+
+    EXIF orientation is applied to the pixels before the metadata is dropped.
+    Images are never upscaled, so a small image gives copies of its own size.
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Args:
+        data: Image file content
+        sizes: Maximum width and height of every copy
+        image_format: Pillow format of the copies, `WEBP` or `JPEG`
+        quality: Encoder quality of the copies
+
+    Returns:
+        Resized copies, in the order of `sizes`
+
+    Raises:
+        ValueError: If the data is not a valid JPEG, PNG or WebP image, or has more than `MAX_IMAGE_PIXELS` pixels
+    """
+    mime_type = sniff_image_type(data[:12])
+    if mime_type is None:
+        raise ValueError("Unsupported image type")
+    try:
+        with Image.open(BytesIO(data), formats=[ACCEPTED_FORMATS[mime_type]]) as source:
+            if source.width * source.height > MAX_IMAGE_PIXELS:
+                raise ValueError("Image is too large")
+            source.load()
+            image = ImageOps.exif_transpose(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError("Invalid image") from e
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha and image_format == "WEBP" else "RGB")
+
+    derivatives = []
+    for size in sizes:
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        # Pixels only: no EXIF, XMP or ICC data is passed to the encoder
+        resized.info = {}
+        buffer = BytesIO()
+        resized.save(buffer, format=image_format, quality=quality)
+        derivatives.append(ImageDerivative(size, resized.width, resized.height, buffer.getvalue()))
+    return derivatives
@@ -0,0 +1,100 @@
+from collections.abc import Sequence
+from itertools import chain, repeat
+
+import numpy as np
+
+WORD_BITS = 64
+
+
+class InterestIndex:
+    """Dense integer IDs of interests and similarity scoring over interest bitsets.
+
+    Each set of interests is packed into a row of `uint64` words, bit `i` being
+    set if the interest with ID `i` is present. Scoring a query against any
+    number of candidates is then a few vectorized AND/OR and popcount operations.
+    """
+
+    def __init__(self, categories: dict[str, list[str]]):
+        """Assign IDs to interests in catalogue order.
+
+        Args:
+            categories: Interest names grouped by category
+        """
+        self.ids: dict[str, int] = {}
+        category_ids: list[list[int]] = []
+        for names in categories.values():
+            category_ids.append([self.ids.setdefault(name, len(self.ids)) for name in names])
+
+        self.words = max(1, -(-len(self.ids) // WORD_BITS))
+        self.category_masks = self.encode_ids(category_ids)
+        # Every category weighs the same in total, however many interests it has
+        self.category_weights = np.array([1 / max(1, len(ids)) for ids in category_ids], dtype=np.float64)
+
+    def _pack(self, rows: np.ndarray, ids: np.ndarray, count: int) -> np.ndarray:
+        """Pack `(row, interest ID)` pairs into a `(count, words)` bitset matrix."""
+        bits = np.zeros((count, self.words * WORD_BITS), dtype=np.bool_)
+        bits[rows, ids] = True
+        return np.packbits(bits, axis=1, bitorder="little").view(np.uint64)
+
+    def encode_ids(self, id_lists: Sequence[Sequence[int]]) -> np.ndarray:
+        """Pack lists of interest IDs into a bitset matrix, one row per list."""
+        lengths = np.fromiter(map(len, id_lists), dtype=np.int64, count=len(id_lists))
+        ids = np.fromiter(chain.from_iterable(id_lists), dtype=np.int64, count=int(lengths.sum()))
+        rows = np.repeat(np.arange(len(id_lists)), lengths)
+        return self._pack(rows, ids, len(id_lists))
+
+    def encode(self, interest_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Pack lists of interest names into a bitset matrix, one row per list.
+
+        Names are looked up without a Python-level loop per user, names missing
+        from the catalogue are ignored.
+        """
+        lengths = np.fromiter(map(len, interest_lists), dtype=np.int64, count=len(interest_lists))
+        names = chain.from_iterable(interest_lists)
+        ids = np.fromiter(map(self.ids.get, names, repeat(-1)), dtype=np.int64, count=int(lengths.sum()))
+        rows = np.repeat(np.arange(len(interest_lists)), lengths)
+        known = ids >= 0
+        return self._pack(rows[known], ids[known], len(interest_lists))
+
+    @staticmethod
+    def _popcount(bitsets: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(bitsets).sum(axis=-1, dtype=np.int64)
+
+    def jaccard(self, candidates: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Jaccard similarity of every candidate row with the query row.
+
+        Args:
+            candidates: Bitset matrix of candidates
+            query: Bitset row of the query
+
+        Returns:
+            Similarity of each candidate, from 0 to 1
+        """
+        intersection = self._popcount(candidates & query)
+        union = self._popcount(candidates | query)
+        return np.divide(intersection, union, out=np.zeros(len(candidates)), where=union > 0)
+
+    def category_weighted(self, candidates: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Weighted Jaccard similarity where every category has the same total weight.
+
+        A shared interest from a small category counts more than one from a large
+        category, so matches are not dominated by the biggest category.
+
+        Args:
+            candidates: Bitset matrix of candidates
+            query: Bitset row of the query
+
+        Returns:
+            Similarity of each candidate, from 0 to 1
+        """
+        # (candidates, categories) counts of shared and combined interests per category
+        intersection = self._popcount((candidates & query)[:, None, :] & self.category_masks[None, :, :])
+        union = self._popcount((candidates | query)[:, None, :] & self.category_masks[None, :, :])
+        weighted_intersection = intersection @ self.category_weights
+        weighted_union = union @ self.category_weights
+        return np.divide(
+            weighted_intersection,
+            weighted_union,
+            out=np.zeros(len(candidates)),
+            where=weighted_union > 0,
+        )
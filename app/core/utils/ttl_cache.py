@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """In-process LRU cache whose entries expire after a fixed time."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """Create an empty cache.
+
+        Args:
+            max_size: Maximum number of entries, the least recently used one is evicted first
+            ttl_seconds: Time in seconds an entry stays valid
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Get a value if it is present and not expired."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V):
+        """Store a value, evicting the least recently used entry if the cache is full."""
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K):
+        """Remove a value if it is present."""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every value."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -2,5 +2,13 @@
 
 set -euo pipefail
 
+# Migrations run once per deploy, replicas started after it can skip them with RUN_MIGRATIONS=false
+if [ "${RUN_MIGRATIONS:-true}" != "true" ]; then
+    exit 0
+fi
+
+# Convert legacy user locations to GeoJSON points and create missing indexes
+PYTHONPATH=$PWD /app/.venv/bin/python app/core/scripts/migrate.py
+
 # Import user interests
 PYTHONPATH=$PWD /app/.venv/bin/python app/core/scripts/user_interest/importer.py
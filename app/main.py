@@ -5,9 +5,20 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.api import ROUTERS
+from app.api.user.feed import FeedService
+from app.config import settings
 from app.core.database import initialize_database
+from app.core.monitoring.middleware import MetricsMiddleware
+from app.core.monitoring.routes import router as metrics_router
+from app.core.services.image_service import ImageService
+from app.core.services.password_service import PasswordService
+from app.core.services.redis_service import RedisService
+from app.core.services.storage_service import StorageService
+from app.core.services.token_store import TokenStore
+from app.core.services.user_cache import UserCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,12 +35,24 @@ with open(Path(__file__).parents[1] / "pyproject.toml", "rb") as f:
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
     """Lifespan for the FastAPI app."""
     logger.info("Starting FastAPI app")
-    await initialize_database()
+    app.state.mongo_client = await initialize_database()
+    await RedisService.connect()
+    UserCache.start()
+    await TokenStore.start()
+    FeedService.start()
     yield
     logger.info("Stopping FastAPI app")
+    await FeedService.stop()
+    await TokenStore.stop()
+    await UserCache.stop()
+    await RedisService.close()
+    PasswordService.shutdown()
+    StorageService.shutdown()
+    ImageService.shutdown()
+    app.state.mongo_client.close()
 
 
 app = FastAPI(
@@ -46,6 +69,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL,
+)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
 
 for router in ROUTERS:
     app.include_router(router)
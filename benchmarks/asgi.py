@@ -0,0 +1,58 @@
+"""Calling ASGI apps directly, without a server or an HTTP client, for microbenchmarks."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Scope
+
+
+def http_scope(path: str, headers: dict[str, str] | None = None) -> Scope:
+    """Make the scope of a GET request."""
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")]
+        + [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 1),
+        "server": ("benchmark", 80),
+    }
+
+
+async def receive() -> Message:
+    """Receive the empty body of a GET request."""
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def fetch(app: ASGIApp, path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    """Send a GET request to an app and get the status, headers and body of the response."""
+    messages: list[Message] = []
+
+    async def send(message: Message):
+        messages.append(message)
+
+    await app(http_scope(path, headers), receive, send)
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return start["status"], response_headers, body
+
+
+async def call(app: ASGIApp, path: str, count: int, headers: dict[str, str] | None = None) -> float:
+    """Send GET requests to an app one by one and get the average time per request in microseconds."""
+
+    async def send(_: Message):
+        pass
+
+    scope = http_scope(path, headers)
+    # Warm up the middleware stack and caches
+    await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / count * 1_000_000
@@ -0,0 +1,55 @@
+"""Compare two load test results.
+
+Prints the change of throughput and latency percentiles of every scenario
+present in both results, and fails if any p95 latency regressed by more than
+the threshold.
+
+Usage:
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def change(base: float, head: float) -> float:
+    """Relative change in percent."""
+    return (head - base) / base * 100 if base else 0.0
+
+
+def main() -> int:
+    """Compares two results and returns 1 if any scenario regressed."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=10, help="Allowed p95 latency regression in percent")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    print(f"base: {base['meta'].get('label') or base['meta'].get('commit')}")
+    print(f"head: {head['meta'].get('label') or head['meta'].get('commit')}")
+
+    regressed = []
+    print(f"\n{'scenario':<44} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (% change)")
+    for name, base_result in base["scenarios"].items():
+        head_result = head["scenarios"].get(name)
+        if head_result is None:
+            continue
+        base_latency, head_latency = base_result["latency_ms"], head_result["latency_ms"]
+        rps = change(base_result["throughput_rps"], head_result["throughput_rps"])
+        p50, p95, p99 = (change(base_latency[p], head_latency[p]) for p in ("p50", "p95", "p99"))
+        print(f"{name:<44} {rps:>+8.1f} {p50:>+8.1f} {p95:>+8.1f} {p99:>+8.1f}")
+        if p95 > args.threshold:
+            regressed.append(name)
+
+    if regressed:
+        print(f"\np95 latency regressed by more than {args.threshold}%: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
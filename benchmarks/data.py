@@ -0,0 +1,141 @@
+"""Synthetic user data for benchmarks.
+
+Creates users named `bench0`, `bench1`, ... with password `BENCH_PASSWORD`.
+Interests come from the real `interests.txt`, with a skewed popularity, and
+locations are spread around a few large cities. Users are written straight to
+the collection in batches, so 1M users take minutes, not hours.
+
+Usage:
+    python -m benchmarks.data --users 100000 [--drop] [--seed 0]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.core.database import initialize_database
+from app.core.models import User, UserInterest
+from app.core.models.user import Gender
+from app.core.scripts.user_interest.importer import PWD, parse_interests
+from app.core.utils.password import get_password_hash
+
+BENCH_PASSWORD = "benchmark1"
+BENCH_USERNAME_PATTERN = r"^bench\d+$"
+
+# (latitude, longitude, share of users)
+CITIES = [
+    (55.75, 37.62, 0.45),
+    (59.94, 30.31, 0.25),
+    (55.03, 82.92, 0.10),
+    (56.84, 60.61, 0.10),
+    (55.79, 49.12, 0.10),
+]
+CITY_SPREAD_DEGREES = 0.15
+NO_LOCATION_SHARE = 0.1
+VERIFIED_SHARE = 0.3
+INACTIVE_SHARE = 0.05
+MIN_INTERESTS, MAX_INTERESTS = 3, 10
+
+
+def bench_username(index: int) -> str:
+    """Get the username of a synthetic user."""
+    return f"bench{index}"
+
+
+def load_interests() -> list[tuple[str, str]]:
+    """Load `(category, name)` pairs from the interests file."""
+    with open(os.path.join(PWD, "interests.txt"), encoding="utf-8") as f:
+        return parse_interests(f.readlines())
+
+
+def make_users(start: int, count: int, names: list[str], password_hash: str, rng: np.random.Generator) -> list[dict]:
+    """Make documents of synthetic users `start` to `start + count`."""
+    now = datetime.now(timezone.utc)
+    # Zipf-like popularity: a few interests are much more common than the rest
+    popularity = 1 / np.arange(1, len(names) + 1)
+    popularity = rng.permutation(popularity / popularity.sum())
+
+    ages = np.clip(rng.normal(29, 7, size=count), 18, 65).astype(int)
+    birth_days = rng.integers(0, 365, size=count)
+    interest_counts = rng.integers(MIN_INTERESTS, MAX_INTERESTS + 1, size=count)
+    cities = rng.choice(len(CITIES), size=count, p=[share for _, _, share in CITIES])
+    offsets = rng.normal(0, CITY_SPREAD_DEGREES, size=(count, 2))
+    has_location = rng.random(count) >= NO_LOCATION_SHARE
+    verified = rng.random(count) < VERIFIED_SHARE
+    active = rng.random(count) >= INACTIVE_SHARE
+    genders = rng.choice([Gender.MALE.value, Gender.FEMALE.value], size=count)
+
+    users = []
+    for i in range(count):
+        index = start + i
+        birth_date = datetime(now.year - ages[i] - 1, 1, 1) + timedelta(days=int(birth_days[i]))
+        latitude, longitude, _ = CITIES[cities[i]]
+        location = None
+        if has_location[i]:
+            location = {
+                "type": "Point",
+                "coordinates": [float(longitude + offsets[i, 1]), float(latitude + offsets[i, 0])],
+            }
+        interests = rng.choice(len(names), size=interest_counts[i], replace=False, p=popularity)
+        users.append(
+            {
+                "username": bench_username(index),
+                "email": f"{bench_username(index)}@example.com",
+                "password_hash": password_hash,
+                "name": f"Bench User {index}",
+                "birth_date": birth_date,
+                "gender": str(genders[i]),
+                "bio": None,
+                "interests": [names[j] for j in interests],
+                "location": location,
+                "photo_urls": [],
+                "photos": [],
+                "verified": bool(verified[i]),
+                "is_active": bool(active[i]),
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+    return users
+
+
+async def main():
+    """Creates synthetic users for benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--drop", action="store_true", help="Delete synthetic users created before")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    await initialize_database(index_mode="create")
+    rng = np.random.default_rng(args.seed)
+    interests = load_interests()
+    names = [name for _, name in interests]
+
+    if await UserInterest.count() == 0:
+        await UserInterest.insert_many([UserInterest(category=category, name=name) for category, name in interests])
+        print(f"Imported {len(interests)} user interests")
+
+    collection = User.get_motor_collection()
+    if args.drop:
+        result = await collection.delete_many({"username": {"$regex": BENCH_USERNAME_PATTERN}})
+        print(f"Deleted {result.deleted_count} synthetic users")
+
+    existing = await collection.count_documents({"username": {"$regex": BENCH_USERNAME_PATTERN}})
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    start_time = time.perf_counter()
+    for start in range(existing, args.users, args.batch_size):
+        count = min(args.batch_size, args.users - start)
+        await collection.insert_many(make_users(start, count, names, password_hash, rng), ordered=False)
+        print(f"Inserted {start + count}/{args.users} users ({time.perf_counter() - start_time:.0f} s)")
+
+    print(f"{max(existing, args.users)} synthetic users, password {BENCH_PASSWORD!r}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""Stress test of concurrent event joins and leaves.
+
+Fires thousands of simultaneous joins, repeated joins of the same users,
+leaves mixed with new joins, and joins racing leaves of the same users at one
+event. Checks that the event is never oversold, that its counter matches the
+participation records and that every call finishes in time. Needs a running MongoDB, configured like the app.
+
+Usage:
+    python -m benchmarks.event_join_stress [--users 5000] [--capacity 100] [--timeout 60]
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from beanie import PydanticObjectId
+
+from app.api.event.service import EventService
+from app.core.database import initialize_database
+from app.core.models import Event, EventParticipant, User
+from app.core.models.location import GeoPoint
+from benchmarks.stress import run
+
+
+async def check(event: Event, expected: int | None) -> bool:
+    """Check that the event is exactly as full as expected, if known, and its counter matches the records."""
+    stored = await Event.get(event.id)
+    records = await EventParticipant.find(EventParticipant.event_id == event.id).count()
+    ok = stored is not None and stored.participants_count == records == (records if expected is None else expected)
+    ok &= records <= event.max_participants
+    print(f"  participants_count={stored and stored.participants_count} records={records} expected={expected}")
+    return ok
+
+
+async def main() -> int:
+    """Runs the stress test and returns 1 if any check fails."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    await initialize_database()
+    rng = np.random.default_rng(args.seed)
+    now = datetime.now(timezone.utc)
+    event = await Event(
+        title="Join stress test",
+        description="Created by benchmarks.event_join_stress",
+        category="benchmark",
+        location=GeoPoint(coordinates=(37.62, 55.75)),
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, hours=2),
+        max_participants=args.capacity,
+        verified=True,
+    ).insert()
+    event_id = str(event.id)
+    # Only IDs of users are used, so they are not stored
+    users = [
+        User(id=PydanticObjectId(), username=f"stress{i}", email=f"stress{i}@example.com", password_hash="")
+        for i in range(args.users)
+    ]
+
+    # Every phase has more users joining than places, so the event ends up full
+    expected = min(args.capacity, args.users)
+    passed = True
+    try:
+        print("Every user joins twice at once")
+        order = rng.permutation(np.tile(np.arange(len(users)), 2))
+        async with asyncio.timeout(args.timeout):
+            await run([EventService.join_event(users[i], event_id) for i in order])
+        passed &= await check(event, expected)
+
+        print("Half of the participants leave while everyone else joins")
+        participants = EventParticipant.find(EventParticipant.event_id == event.id)
+        joined = {participant.user_id async for participant in participants}
+        leaving = [user for user in users if user.id in joined][: len(joined) // 2]
+        calls = [EventService.leave_event(user, event_id) for user in leaving]
+        calls += [EventService.join_event(user, event_id) for user in users if user.id not in joined]
+        async with asyncio.timeout(args.timeout):
+            await run([calls[i] for i in rng.permutation(len(calls))])
+        passed &= await check(event, expected)
+
+        print("Users join and leave at once, each of them both ways")
+        calls = []
+        for i, user in enumerate(users):
+            pair = [EventService.join_event(user, event_id), EventService.leave_event(user, event_id)]
+            calls += pair if i % 2 else pair[::-1]
+        async with asyncio.timeout(args.timeout):
+            await run([calls[i] for i in rng.permutation(len(calls))])
+        passed &= await check(event, None)
+
+        print("Everyone joins again, which fills exactly the free places")
+        participants = EventParticipant.find(EventParticipant.event_id == event.id)
+        joined = {participant.user_id async for participant in participants}
+        calls = [EventService.join_event(user, event_id) for user in users if user.id not in joined]
+        async with asyncio.timeout(args.timeout):
+            await run([calls[i] for i in rng.permutation(len(calls))])
+        passed &= await check(event, expected)
+    except TimeoutError:
+        print(f"  calls did not finish in {args.timeout} s")
+        passed = False
+    finally:
+        await EventParticipant.find(EventParticipant.event_id == event.id).delete()
+        await event.delete()
+
+    print("PASSED" if passed else "FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,133 @@
+"""Check of keyset paging by distance when many results are at the same distance.
+
+Creates users and events in groups at identical coordinates, each group larger
+than a page, inserted in an order unrelated to their IDs, so `$geoNear` returns
+the members of a group in another order than `_id`. Then pages through the user
+and the event search and checks that every user and event is returned exactly
+once. Needs a running MongoDB with the indexes of
+`python app/core/scripts/migrate.py`, configured like the app.
+
+Usage:
+    python -m benchmarks.geo_paging [--groups 4] [--ties 25] [--limit 10]
+"""
+
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from beanie import PydanticObjectId
+
+from app.api.event.schemas import EventFilter
+from app.api.event.service import EventService
+from app.api.user.schemas import UserFilter
+from app.api.user.service import UserService
+from app.core.database import initialize_database
+from app.core.models import Event, User
+from app.core.models.location import GeoPoint
+
+PREFIX = "geopaging"
+# Open ocean, far from the synthetic users of `benchmarks.data`
+LATITUDE, LONGITUDE = 10.0, -140.0
+RADIUS_KM = 50
+
+
+def make_ids(groups: int, ties: int, rng: np.random.Generator) -> list[tuple[PydanticObjectId, GeoPoint]]:
+    """Make IDs in groups at the same point, shuffled so the insertion order is not the `_id` order."""
+    ids = sorted(PydanticObjectId() for _ in range(groups * ties))
+    points = [GeoPoint(coordinates=(LONGITUDE + 0.01 * (i // ties + 1), LATITUDE)) for i in range(len(ids))]
+    return [(ids[i], points[i]) for i in rng.permutation(len(ids))]
+
+
+async def page_through(search: Callable[[str | None], Awaitable[tuple[list, str | None]]]) -> Counter[str]:
+    """Fetch every page of a search and count how often each ID was returned."""
+    returned: Counter[str] = Counter()
+    cursor = None
+    while True:
+        page, cursor = await search(cursor)
+        returned.update(str(item.id) for item in page)
+        if cursor is None:
+            return returned
+
+
+def check(name: str, expected: set[str], returned: Counter[str]) -> bool:
+    """Check that every expected ID was returned exactly once, and nothing else."""
+    repeated = sum(1 for count in returned.values() if count > 1)
+    missing = len(expected - returned.keys())
+    unexpected = len(returned.keys() - expected)
+    print(f"  {name}: {len(expected)} expected, {missing} missing, {repeated} repeated, {unexpected} unexpected")
+    return repeated == missing == unexpected == 0
+
+
+async def main() -> int:
+    """Runs the check and returns 1 if any search skips or repeats results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=4, help="Number of points")
+    parser.add_argument("--ties", type=int, default=25, help="Users and events at each point")
+    parser.add_argument("--limit", type=int, default=10, help="Page size, less than --ties")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    await initialize_database()
+    rng = np.random.default_rng(args.seed)
+    now = datetime.now(timezone.utc)
+    users = [
+        User(id=user_id, username=f"{PREFIX}{i}", email=f"{PREFIX}{i}@example.com", password_hash="", location=point)
+        for i, (user_id, point) in enumerate(make_ids(args.groups, args.ties, rng))
+    ]
+    events = [
+        Event(
+            id=event_id,
+            title="Geo paging check",
+            description="Created by benchmarks.geo_paging",
+            category=PREFIX,
+            location=point,
+            start_date=now + timedelta(days=1),
+            end_date=now + timedelta(days=1, hours=2),
+            max_participants=10,
+            verified=True,
+        )
+        for event_id, point in make_ids(args.groups, args.ties, rng)
+    ]
+    await User.insert_many(users)
+    await Event.insert_many(events)
+    passed = True
+    try:
+        print(f"{args.groups} points with {args.ties} results each, pages of {args.limit}")
+
+        def user_page(cursor: str | None) -> Awaitable[tuple[list, str | None]]:
+            filter_params = UserFilter(
+                latitude=LATITUDE,
+                longitude=LONGITUDE,
+                radius_km=RADIUS_KM,
+                limit=args.limit,
+                cursor=cursor,
+            )
+            return UserService.search_users(filter_params)
+
+        def event_page(cursor: str | None) -> Awaitable[tuple[list, str | None]]:
+            filter_params = EventFilter(
+                latitude=LATITUDE,
+                longitude=LONGITUDE,
+                radius_km=RADIUS_KM,
+                category=PREFIX,
+                limit=args.limit,
+                cursor=cursor,
+            )
+            return EventService.search_events(filter_params)
+
+        passed &= check("users", {str(user.id) for user in users}, await page_through(user_page))
+        passed &= check("events", {str(event.id) for event in events}, await page_through(event_page))
+    finally:
+        await User.find({"username": {"$regex": f"^{PREFIX}"}}).delete()
+        await Event.find(Event.category == PREFIX).delete()
+
+    print("PASSED" if passed else "FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,122 @@
+"""Serialization cost of user search pages.
+
+Serves the same page of synthetic users from a FastAPI app in the stock way,
+returned as a dict and validated against `response_model`, and through
+`trusted_json_response`, with and without gzip. The app is called directly
+through ASGI on one core, so requests/s is per core and excludes the database.
+
+Usage:
+    python -m benchmarks.json_responses [--rows 100] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+
+from app.api.user.schemas import UserSearchResponse
+from app.api.user.service import UserRead
+from app.config import settings
+from app.core.utils.responses import trusted_json_response
+from benchmarks.asgi import call, fetch
+
+
+def make_page(rows: int) -> list[UserRead]:
+    """Make a page of users as `UserService.search_users` returns them."""
+    now = datetime.now(timezone.utc)
+    return [
+        UserRead.model_validate(
+            {
+                "id": f"{i:024x}",
+                "username": f"bench{i}",
+                "email": f"bench{i}@example.com",
+                "name": f"Bench User {i}",
+                "birth_date": "1995-06-15",
+                "age": 30,
+                "gender": "female",
+                "bio": "Likes long walks and short benchmarks. " * 3,
+                "interests": ["Психология 🧠", "Кинотеатры 🎬", "Путешествия ✈️", "Йога 🧘", "Книги 📚"],
+                "location": {"type": "Point", "coordinates": [37.62, 55.75]},
+                "photo_urls": [f"https://cdn.example.com/{i}_photo_1080.webp"],
+                "photos": [
+                    {
+                        "id": f"photo{i}",
+                        "derivatives": [
+                            {
+                                "size": size,
+                                "width": size,
+                                "height": size,
+                                "url": f"https://cdn.example.com/{i}_{size}.webp",
+                            }
+                            for size in settings.PROFILE_PICTURE_SIZES
+                        ],
+                        "created_at": now,
+                    },
+                ],
+                "verified": i % 3 == 0,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        for i in range(rows)
+    ]
+
+
+def make_app(users: list[UserRead], gzip: bool) -> FastAPI:
+    """Make an app serving the page in the stock way and through the fast path."""
+    app = FastAPI()
+    if gzip:
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=settings.GZIP_MINIMUM_SIZE,
+            compresslevel=settings.GZIP_COMPRESS_LEVEL,
+        )
+
+    @app.get("/stock", response_model=UserSearchResponse)
+    async def stock():
+        return {"users": users, "next_cursor": "cursor"}
+
+    @app.get("/fast", response_model=UserSearchResponse)
+    async def fast():
+        page = UserSearchResponse.model_construct(users=users, next_cursor="cursor")
+        return trusted_json_response(page, UserSearchResponse)
+
+    return app
+
+
+async def main():
+    """Runs the benchmark and prints requests/s per core of every variant."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    users = make_page(args.rows)
+    plain, compressed = make_app(users, gzip=False), make_app(users, gzip=True)
+    gzip_headers = {"Accept-Encoding": "gzip"}
+
+    _, _, stock_body = await fetch(plain, "/stock")
+    _, _, fast_body = await fetch(plain, "/fast")
+    if json.loads(stock_body) != json.loads(fast_body):
+        raise SystemExit("The fast path serializes the page differently")
+
+    variants = [
+        ("stock", plain, "/stock", None),
+        ("fast", plain, "/fast", None),
+        ("stock + gzip", compressed, "/stock", gzip_headers),
+        ("fast + gzip", compressed, "/fast", gzip_headers),
+    ]
+    print(f"{args.rows} rows per page, identical JSON from both paths")
+    print(f"{'variant':<14} {'req/s/core':>10} {'us/req':>8} {'bytes':>8}")
+    for name, app, path, headers in variants:
+        _, _, body = await fetch(app, path, headers)
+        micros = await call(app, path, args.requests, headers)
+        print(f"{name:<14} {1_000_000 / micros:>10.0f} {micros:>8.1f} {len(body):>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,268 @@
+"""Load test of the API.
+
+Drives the real FastAPI app in process through `httpx.ASGITransport`, or a
+running server with `--base-url`. The app uses the MongoDB and Redis it is
+configured with, filled by `benchmarks.data`. Every scenario sends a fixed
+number of requests from concurrent clients and reports throughput and latency
+percentiles, written as JSON that `benchmarks.compare` compares between commits.
+
+Usage:
+    python -m benchmarks.load_test [--requests 1000] [--concurrency 32] [--output results.json]
+        [--base-url http://localhost:8000] [--scenario users_me ...]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from app.api.user.schemas import UserFilter
+from app.api.user.service import UserRead, UserService
+from app.core.database import search_collection
+from app.core.models import User
+from app.core.scripts.index_advisor import USER_QUERY_SHAPES
+from benchmarks.data import BENCH_PASSWORD, bench_username
+
+ROOT = Path(__file__).parents[1]
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def git_commit() -> str | None:
+    """Get the commit the working tree is at, without calling git."""
+    git_dir = ROOT / ".git"
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head
+        ref = head.removeprefix("ref: ")
+        if (git_dir / ref).exists():
+            return (git_dir / ref).read_text().strip()
+        for line in (git_dir / "packed-refs").read_text().splitlines():
+            if line.endswith(f" {ref}"):
+                return line.split()[0]
+    except OSError:
+        pass
+    return None
+
+
+def summarize(latencies: list[float], statuses: Counter[int], seconds: float) -> dict:
+    """Summarize the latencies in milliseconds and the status codes of a scenario."""
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code >= 400),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(len(latencies) / seconds, 1),
+        "latency_ms": {
+            "mean": round(float(latencies_ms.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(latencies_ms.max()), 2),
+        },
+    }
+
+
+async def measure(client: httpx.AsyncClient, request: Request, total: int, concurrency: int) -> dict:
+    """Send `total` requests from `concurrency` clients at once and summarize them."""
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await request(client)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+async def login(client: httpx.AsyncClient, index: int = 0) -> httpx.Response:
+    """Log in as a synthetic user."""
+    return await client.post("/auth/login", data={"username": bench_username(index), "password": BENCH_PASSWORD})
+
+
+async def cursor_at_page(client: httpx.AsyncClient, params: dict, page: int) -> str | None:
+    """Walk search pages to get the cursor of a deep page."""
+    cursor = None
+    for _ in range(page - 1):
+        response = await client.get("/users/", params={**params, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    return cursor
+
+
+def search_page_query(page: int, limit: int, cursor: str | None) -> Request:
+    """Read a search page straight from the service, by skip and limit if no cursor is given.
+
+    Skip and limit is how `GET /users/` paged before keyset cursors, so the two
+    are compared on the same data without HTTP. Needs the app in process.
+    """
+    filter_params = UserFilter(limit=limit, cursor=cursor)
+
+    async def request(_: httpx.AsyncClient) -> httpx.Response:
+        if cursor is not None:
+            await UserService.search_users(filter_params)
+        else:
+            query = UserService.build_search_query(filter_params).get_filter_query()
+            pages = search_collection(User).find(
+                query,
+                UserRead.Settings.projection,
+                sort=[("_id", 1)],
+                skip=(page - 1) * limit,
+                limit=limit,
+            )
+            [UserRead.model_validate(user) async for user in pages]
+        return httpx.Response(200)
+
+    return request
+
+
+async def build_scenarios(client: httpx.AsyncClient, args: argparse.Namespace) -> dict[str, Request]:
+    """Build the requests of every scenario."""
+    rng = np.random.default_rng(args.seed)
+
+    response = await client.get("/users/", params={"limit": 100})
+    response.raise_for_status()
+    user_ids = [user["id"] for user in response.json()["users"]]
+
+    response = await client.get("/user-interests/")
+    response.raise_for_status()
+    interests_etag = response.headers.get("ETag", "")
+
+    page_params = {"limit": 20}
+    deep_cursor = await cursor_at_page(client, page_params, args.deep_page)
+
+    scenarios: dict[str, Request] = {
+        "auth_login": lambda c: login(c, int(rng.integers(args.login_users))),
+        "users_me": lambda c: c.get("/users/me"),
+        "user_interests": lambda c: c.get("/user-interests/"),
+        "user_interests_not_modified": lambda c: c.get("/user-interests/", headers={"If-None-Match": interests_etag}),
+        "users_profile": lambda c: c.get(f"/users/{user_ids[int(rng.integers(len(user_ids)))]}"),
+        # A screen of 20 profiles in one request instead of 20 `users_profile` requests
+        "users_batch_20": lambda c: c.get(
+            "/users/batch",
+            params={"ids": [user_ids[i] for i in rng.choice(len(user_ids), min(20, len(user_ids)), replace=False)]},
+        ),
+        "users_search_page_1": lambda c: c.get("/users/", params=page_params),
+        f"users_search_page_{args.deep_page}": lambda c: c.get(
+            "/users/",
+            params={**page_params, **({"cursor": deep_cursor} if deep_cursor else {})},
+        ),
+        "users_recommendations": lambda c: c.get("/users/recommendations"),
+        # Pops the queue of the logged in user, who runs out of unseen users after the whole collection
+        "users_feed": lambda c: c.get("/users/feed"),
+    }
+    for shape, filter_params in USER_QUERY_SHAPES.items():
+        params = filter_params.model_dump(mode="json", exclude_none=True)
+        scenarios[f"users_search[{shape}]"] = lambda c, params=params: c.get("/users/", params=params)
+    if not args.base_url and deep_cursor is not None:
+        # Deep pages cost as much as the first one by keyset and grow with the page number by skip and limit
+        limit = page_params["limit"]
+        scenarios["search_query_offset_page_1"] = search_page_query(1, limit, None)
+        scenarios[f"search_query_offset_page_{args.deep_page}"] = search_page_query(args.deep_page, limit, None)
+        scenarios[f"search_query_keyset_page_{args.deep_page}"] = search_page_query(args.deep_page, limit, deep_cursor)
+    return scenarios
+
+
+async def users_me_under_login(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    """Measure `/users/me` while logins saturate the password hashing pool."""
+    rng = np.random.default_rng(args.seed)
+    stop = asyncio.Event()
+
+    async def flood():
+        while not stop.is_set():
+            await login(client, int(rng.integers(args.login_users)))
+
+    flooders = [asyncio.create_task(flood()) for _ in range(args.concurrency)]
+    try:
+        return await measure(client, lambda c: c.get("/users/me"), args.requests, args.concurrency)
+    finally:
+        stop.set()
+        await asyncio.gather(*flooders, return_exceptions=True)
+
+
+async def main():
+    """Runs the load test and writes the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--base-url", help="URL of a running server, the app runs in process if not given")
+    parser.add_argument("--scenario", action="append", help="Run only these scenarios, can be repeated")
+    parser.add_argument("--deep-page", type=int, default=500, help="Page number of the deep page scenario")
+    parser.add_argument("--login-users", type=int, default=1000, help="Synthetic users to log in as")
+    parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    parser.add_argument("--label", help="Label of the run, such as a branch name")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=None))
+            base_url = args.base_url
+        else:
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://benchmark"
+        client = await stack.enter_async_context(httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60))
+
+        response = await login(client)
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        scenarios = await build_scenarios(client, args)
+        names = [*scenarios, "users_me_under_login"]
+        selected = [name for name in names if not args.scenario or name in args.scenario]
+
+        results = {}
+        for name in selected:
+            if name == "users_me_under_login":
+                result = await users_me_under_login(client, args)
+            else:
+                result = await measure(client, scenarios[name], args.requests, args.concurrency)
+            results[name] = result
+            latency = result["latency_ms"]
+            print(
+                f"{name:<44} {result['throughput_rps']:>9.1f} rps  p50 {latency['p50']:>8.2f}  "
+                f"p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  errors {result['errors']}",
+            )
+
+    report = {
+        "meta": {
+            "label": args.label,
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": args.base_url or "asgi",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Overhead of the metrics instrumentation.
+
+Calls a FastAPI app with as many routes as the real one directly through ASGI,
+with and without `MetricsMiddleware`, so the difference is the cost the
+middleware adds to every request. Also times one MongoDB command observation
+of `CommandTimer` and one histogram observation, which Redis and S3 calls pay.
+
+Usage:
+    python -m benchmarks.metrics_overhead [--requests 20000] [--routes 30] [--max-overhead-us 25]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from app.core.monitoring.metrics import REDIS_COMMAND_DURATION
+from app.core.monitoring.middleware import MetricsMiddleware
+from app.core.monitoring.mongodb import CommandTimer
+from benchmarks.asgi import call
+
+
+def make_app(routes: int, with_metrics: bool) -> FastAPI:
+    """Make an app with parametrized routes that do nothing."""
+    app = FastAPI()
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+
+    async def endpoint(item_id: str) -> dict:
+        return {"id": item_id}
+
+    for i in range(routes):
+        app.add_api_route(f"/items{i}/{{item_id}}", endpoint, methods=["GET"])
+    return app
+
+
+def time_per_call(func: object, count: int) -> float:
+    """Average time of a function call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+def main() -> int:
+    """Runs the benchmark and returns 1 if the middleware overhead is above the limit."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--routes", type=int, default=30, help="Routes in the app, the last one is requested")
+    parser.add_argument("--max-overhead-us", type=float, default=25, help="Allowed middleware overhead per request")
+    args = parser.parse_args()
+
+    # The last route is the most expensive to match
+    path = f"/items{args.routes - 1}/42"
+    without = asyncio.run(call(make_app(args.routes, with_metrics=False), path, args.requests))
+    with_metrics = asyncio.run(call(make_app(args.routes, with_metrics=True), path, args.requests))
+    overhead = with_metrics - without
+
+    timer = CommandTimer()
+    started = SimpleNamespace(command={"find": "users"}, command_name="find", connection_id=("localhost", 27017))
+    succeeded = SimpleNamespace(command_name="find", connection_id=("localhost", 27017), duration_micros=1000)
+
+    def mongo_command():
+        started.request_id = succeeded.request_id = 1
+        timer.started(started)
+        timer.succeeded(succeeded)
+
+    mongo = time_per_call(mongo_command, args.requests)
+    histogram = time_per_call(lambda: REDIS_COMMAND_DURATION.labels("GET", "success").observe(0.001), args.requests)
+
+    print(f"request without metrics       {without:8.2f} us")
+    print(f"request with metrics          {with_metrics:8.2f} us")
+    print(f"middleware overhead           {overhead:8.2f} us ({overhead / without * 100:.1f}%)")
+    print(f"MongoDB command observation   {mongo:8.2f} us")
+    print(f"Redis or S3 call observation  {histogram:8.2f} us")
+
+    if overhead > args.max_overhead_us:
+        print(f"Middleware overhead is above {args.max_overhead_us} us")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Profile cache hits and thundering herds.
+
+Serves one synthetic profile from a FastAPI app read and serialized on every
+request, as `GET /users/{user_id}` did, through `ProfileCache`, and through the
+cache with `If-None-Match`. Database reads are simulated with a sleep. Then
+sends a burst of concurrent requests for a profile that is not cached and
+counts the database reads. Needs a running Redis, configured like the app.
+
+Usage:
+    python -m benchmarks.profile_cache [--requests 2000] [--herd 1000] [--db-ms 2]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Annotated
+
+from fastapi import FastAPI, Header, Response
+
+from app.api.user.schemas import UserResponse
+from app.core.services.profile_cache import CachedProfile, ProfileCache
+from app.core.services.redis_service import RedisService
+from app.core.utils.etag import json_response
+from app.core.utils.responses import trusted_json
+from benchmarks.asgi import call, fetch
+from benchmarks.json_responses import make_page
+
+USER_ID = "b" * 24
+
+
+def make_app(loads: list[int], db_seconds: float) -> FastAPI:
+    """Make an app serving the profile read per request and through the cache."""
+    app = FastAPI()
+    user = make_page(1)[0]
+
+    async def load() -> CachedProfile:
+        loads[0] += 1
+        await asyncio.sleep(db_seconds)
+        return CachedProfile(content=trusted_json(user, UserResponse), etag=f'"{user.updated_at:%Y%m%d%H%M%S%f}"')
+
+    @app.get("/uncached/{user_id}", response_model=UserResponse)
+    async def uncached(user_id: str) -> Response:
+        profile = await load()
+        return json_response(profile.content, profile.etag, None)
+
+    @app.get("/cached/{user_id}", response_model=UserResponse)
+    async def cached(user_id: str, if_none_match: Annotated[str | None, Header()] = None) -> Response:
+        profile = await ProfileCache.get(user_id, load)
+        return json_response(profile.content, profile.etag, if_none_match)
+
+    return app
+
+
+async def main() -> int:
+    """Runs the benchmark and returns 1 if a herd read the database more than once."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--herd", type=int, default=1000, help="Concurrent requests for an uncached profile")
+    parser.add_argument("--db-ms", type=float, default=2, help="Simulated duration of a database read")
+    args = parser.parse_args()
+
+    await RedisService.connect()
+    loads = [0]
+    app = make_app(loads, args.db_ms / 1000)
+    try:
+        await ProfileCache.invalidate(USER_ID)
+        _, headers, _ = await fetch(app, f"/cached/{USER_ID}")
+        not_modified = {"If-None-Match": headers["etag"]}
+
+        print(f"{'variant':<20} {'req/s':>10} {'us/req':>8}")
+        for name, path, request_headers in [
+            ("uncached", f"/uncached/{USER_ID}", None),
+            ("cached", f"/cached/{USER_ID}", None),
+            ("cached, 304", f"/cached/{USER_ID}", not_modified),
+        ]:
+            micros = await call(app, path, args.requests, request_headers)
+            print(f"{name:<20} {1_000_000 / micros:>10.0f} {micros:>8.1f}")
+
+        await ProfileCache.invalidate(USER_ID)
+        loads[0] = 0
+        responses = await asyncio.gather(*(fetch(app, f"/cached/{USER_ID}") for _ in range(args.herd)))
+        statuses = {status for status, _, _ in responses}
+        print(f"{args.herd} concurrent requests of an uncached profile: {loads[0]} database reads, statuses {statuses}")
+    finally:
+        await ProfileCache.invalidate(USER_ID)
+        await RedisService.close()
+
+    passed = loads[0] == 1
+    print("PASSED" if passed else "FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,104 @@
+"""Stress test of concurrent registrations with the same usernames and emails.
+
+Registers many users at once that share usernames or emails with each other,
+differing only in case, and checks that exactly one user got each username and
+each email. Registrations hash the password before inserting, a wide window
+for a check for existing users to be raced past. Needs a running MongoDB with
+the indexes of `python app/core/scripts/migrate.py`, configured like the app.
+
+Usage:
+    python -m benchmarks.register_stress [--names 4] [--attempts 8] [--timeout 60]
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import Coroutine
+from typing import Any
+
+from app.api.auth.service import AuthService
+from app.core.database import initialize_database
+from app.core.models import User
+from app.core.models.user import CASE_INSENSITIVE
+from benchmarks.stress import run
+
+PREFIX = "regstress"
+PASSWORD = "benchmark1"
+
+
+def vary_case(value: str, attempt: int) -> str:
+    """Spell a value in a different case for every attempt."""
+    return "".join(c.upper() if (attempt >> i) & 1 else c for i, c in enumerate(value))
+
+
+def registrations(names: int, attempts: int) -> list[Coroutine[Any, Any, User]]:
+    """Make registrations that compete for the same usernames and for the same emails."""
+    calls = []
+    for name in range(names):
+        for attempt in range(attempts):
+            # Same username, unique emails
+            calls.append(
+                AuthService.register(
+                    name="Stress",
+                    username=vary_case(f"{PREFIX}{name}", attempt),
+                    email=f"{PREFIX}{name}.u{attempt}@example.com",
+                    password=PASSWORD,
+                ),
+            )
+            # Same email, unique usernames
+            calls.append(
+                AuthService.register(
+                    name="Stress",
+                    username=f"{PREFIX}{name}_e{attempt}",
+                    email=vary_case(f"{PREFIX}{name}@example.com", attempt),
+                    password=PASSWORD,
+                ),
+            )
+    return calls
+
+
+async def check(names: int) -> bool:
+    """Check that every contested username and email belongs to exactly one user."""
+    passed = True
+    for name in range(names):
+        for field, value in (("username", f"{PREFIX}{name}"), ("email", f"{PREFIX}{name}@example.com")):
+            count = await User.get_motor_collection().count_documents({field: value}, collation=CASE_INSENSITIVE)
+            if count != 1:
+                print(f"  {count} users with {field} {value}")
+                passed = False
+    return passed
+
+
+async def main() -> int:
+    """Runs the stress test and returns 1 if any check fails."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=4, help="Number of contested usernames and emails")
+    parser.add_argument("--attempts", type=int, default=8, help="Registrations competing for each of them")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    await initialize_database()
+    users = User.get_motor_collection()
+    created = {"username": {"$regex": f"^{PREFIX}", "$options": "i"}}
+    await users.delete_many(created)
+    passed = True
+    try:
+        print("Registrations with the same usernames and emails in different case at once")
+        async with asyncio.timeout(args.timeout):
+            outcomes = await run(registrations(args.names, args.attempts))
+        errors = sum(count for outcome, count in outcomes.items() if not outcome.startswith(("ok", "400")))
+        if errors:
+            print(f"  {errors} calls failed for other reasons, lower --names or --attempts")
+        passed &= errors == 0 and await check(args.names)
+    except TimeoutError:
+        print(f"  calls did not finish in {args.timeout} s")
+        passed = False
+    finally:
+        await users.delete_many(created)
+
+    print("PASSED" if passed else "FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
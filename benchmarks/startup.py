@@ -0,0 +1,100 @@
+"""Cold start time of the app.
+
+Measures the time to import `app.main` in a fresh interpreter, and the time
+from starting a uvicorn server to its first successful request, which
+needs MongoDB and Redis like the app, for each index mode of
+`MONGO_INDEX_MODE`. Run `python app/core/scripts/migrate.py` first, or the
+`verify` mode fails on missing indexes.
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--index-mode verify --index-mode create] [--path /user-interests/]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).parents[1]
+IMPORT_SCRIPT = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+
+
+def free_port() -> int:
+    """Get a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_time() -> float:
+    """Import `app.main` in a fresh interpreter and get the time it took in seconds."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_to_first_request(index_mode: str, path: str, timeout: float) -> float:
+    """Start a server and get the time in seconds until a request to `path` succeeds.
+
+    Raises:
+        TimeoutError: If no request succeeded in time
+    """
+    port = free_port()
+    env = {**os.environ, "MONGO_INDEX_MODE": index_mode}
+    start = time.perf_counter()
+    server = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() - start < timeout:
+                if server.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {server.returncode}")
+                try:
+                    if client.get(path).status_code == httpx.codes.OK:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise TimeoutError(f"No successful request to {path} in {timeout} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report(name: str, seconds: list[float]):
+    """Print the median and range of measurements in milliseconds."""
+    ms = [s * 1000 for s in seconds]
+    print(f"{name:<36} median {statistics.median(ms):>8.0f} ms  min {min(ms):>8.0f}  max {max(ms):>8.0f}")
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--index-mode", action="append", choices=["create", "verify", "skip"])
+    parser.add_argument("--path", default="/user-interests/", help="Request that has to succeed")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    report("import app.main", [import_time() for _ in range(args.runs)])
+    for index_mode in args.index_mode or ["verify", "create"]:
+        seconds = [time_to_first_request(index_mode, args.path, args.timeout) for _ in range(args.runs)]
+        report(f"first request, indexes: {index_mode}", seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Running calls at once for stress tests and counting their outcomes."""
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Coroutine
+from typing import Any
+
+from fastapi import HTTPException
+
+
+async def run(calls: list[Coroutine[Any, Any, Any]]) -> Counter[str]:
+    """Run calls at once and count their outcomes.
+
+    Calls that return count as `ok`, HTTP errors by status code and detail and
+    other exceptions by type.
+    """
+    start = time.perf_counter()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    outcomes: Counter[str] = Counter()
+    for result in results:
+        if isinstance(result, HTTPException):
+            outcomes[f"{result.status_code} {result.detail}"] += 1
+        elif isinstance(result, BaseException):
+            outcomes[f"error {type(result).__name__}"] += 1
+        else:
+            outcomes["ok"] += 1
+    print(f"  {len(calls)} calls in {elapsed:.2f} s ({len(calls) / elapsed:.0f}/s): {dict(outcomes)}")
+    return outcomes